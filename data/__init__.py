@@ -0,0 +1,15 @@
+"""Synthetic KB dataset: the generator and the location of its output."""
+
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Loaded here as well as in src.config so the generator, which does not
+# import src.config, sees the same .env settings as the readers
+load_dotenv()
+
+# RAG_DATA_DIR relocates the KB files (e.g. for relocated deployments). The
+# generator writes them there and the indexer and demos read them from there.
+KB_DATA_DIR = Path(os.environ.get("RAG_DATA_DIR") or os.path.dirname(__file__))
+KB_PATH = KB_DATA_DIR / "kb_articles.json"
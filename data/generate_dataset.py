@@ -16,34 +16,73 @@ Run:
 
 from __future__ import annotations
 
-import json
+import functools
+import heapq
+import os
 import random
-from datetime import date, timedelta
+import string
+import sys
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+import orjson
+import zstandard
+
+from data import KB_DATA_DIR, KB_PATH
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
+# The sequence of draws from Random(SEED) is part of the dataset contract:
+# demos and the eval set reference doc_ids and contents produced by exactly
+# this order of calls. Optimizations must consume the stream identically
+# (e.g. sampling indices instead of items), not batch or reorder draws.
 SEED = 42
 NUM_ARTICLES = 200
-DATA_DIR = Path(__file__).resolve().parent
-OUTPUT_PATH = DATA_DIR / "kb_articles.json"
-EVAL_OUTPUT_PATH = DATA_DIR.parent / "evals" / "eval_set.json"
-
+_PACKAGE_DIR = os.path.dirname(__file__)
+OUTPUT_PATH = KB_PATH  # under RAG_DATA_DIR when set, see data/__init__.py
+JSONL_OUTPUT_PATH = OUTPUT_PATH.with_suffix(".jsonl")
+ZSTD_OUTPUT_PATH = OUTPUT_PATH.with_suffix(".json.zst")
+EVAL_OUTPUT_PATH = Path(_PACKAGE_DIR).parent / "evals" / "eval_set.json"
+_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+_ZSTD_LEVEL = 3
+
+# Doc IDs in generation order; an article's ID is KB-{position + 1}.
+_DOC_IDS: tuple[str, ...] = tuple(f"KB-{i:04d}" for i in range(1, NUM_ARTICLES + 1))
+
+# Small values repeated across every article are interned so all articles
+# share one object per value. Region and category names are identifier-like
+# literals, which CPython already interns.
 REGIONS: list[str] = ["EU", "US", "APAC"]
-VERSIONS: list[str] = ["v1.0", "v2.0", "v3.0"]
+VERSIONS: list[str] = [sys.intern(v) for v in ("v1.0", "v2.0", "v3.0")]
 CATEGORIES: list[str] = ["authentication", "billing", "deployment", "networking"]
 
 # Error code pools per category (15 each = 60 total, spec says ~40 but we
 # need room for the cross-region codes like E-4012 referenced in demos)
 ERROR_CODES: dict[str, list[str]] = {
-    "authentication": [f"E-{1001 + i}" for i in range(15)],
-    "billing": [f"E-{2001 + i}" for i in range(15)],
-    "deployment": [f"E-{3001 + i}" for i in range(15)],
-    "networking": [f"E-{4001 + i}" for i in range(15)],
+    "authentication": [sys.intern(f"E-{1001 + i}") for i in range(15)],
+    "billing": [sys.intern(f"E-{2001 + i}") for i in range(15)],
+    "deployment": [sys.intern(f"E-{3001 + i}") for i in range(15)],
+    "networking": [sys.intern(f"E-{4001 + i}") for i in range(15)],
+}
+
+_CODE_POOLS: dict[str, tuple[str, ...]] = {
+    category: tuple(codes) for category, codes in ERROR_CODES.items()
+}
+
+# Error code -> owning category (the code's thousands digit selects the pool)
+_CODE_TO_CATEGORY: dict[str, str] = {
+    code: category for category, codes in ERROR_CODES.items() for code in codes
 }
 
+# Every valid code, sorted, for the vectorized pool check in validate_articles
+_VALID_CODES = np.sort(np.array([code for codes in ERROR_CODES.values() for code in codes]))
+
 # Version -> date range alignment
 VERSION_DATE_RANGES: dict[str, tuple[date, date]] = {
     "v1.0": (date(2023, 1, 1), date(2023, 12, 31)),
@@ -51,15 +90,33 @@ VERSION_DATE_RANGES: dict[str, tuple[date, date]] = {
     "v3.0": (date(2025, 1, 1), date(2025, 6, 1)),
 }
 
+# Version -> row in the range bound arrays used by validate_articles
+_VERSION_INDEX: dict[str, int] = {version: i for i, version in enumerate(VERSION_DATE_RANGES)}
+_RANGE_STARTS = np.array(
+    [start for start, _ in VERSION_DATE_RANGES.values()], dtype="datetime64[D]"
+)
+_RANGE_ENDS = np.array([end for _, end in VERSION_DATE_RANGES.values()], dtype="datetime64[D]")
+
+# Version -> every date in its range, in order. ``rng.choice`` over a
+# pool draws exactly what ``rng.randint(0, len(pool) - 1)`` would, so the
+# stream is unchanged versus offsetting from the range start.
+_DATE_POOL: dict[str, tuple[date, ...]] = {
+    version: tuple(
+        date.fromordinal(ordinal)
+        for ordinal in range(start.toordinal(), end.toordinal() + 1)
+    )
+    for version, (start, end) in VERSION_DATE_RANGES.items()
+}
+
 # ---------------------------------------------------------------------------
 # Cross-region error codes (Property 1)
 # At least 8 error codes appear in 2+ regions with *different* resolution steps.
 # ---------------------------------------------------------------------------
-CROSS_REGION_CODES: list[str] = [
+CROSS_REGION_CODES: list[str] = [sys.intern(code) for code in (
     "E-1001", "E-1005", "E-2003", "E-2007",
     "E-3002", "E-3006", "E-4001", "E-4005",
     "E-4008", "E-4012",
-]
+)]
 
 REGION_SPECIFIC_RESOLUTION: dict[str, dict[str, str]] = {
     "EU": {
@@ -100,6 +157,13 @@ REGION_SPECIFIC_RESOLUTION: dict[str, dict[str, str]] = {
     },
 }
 
+# Per-region resolutions as tuples aligned with CROSS_REGION_CODES, so a
+# lookup is one dict probe plus a tuple index by code position
+_RES_BY_REGION: dict[str, tuple[str, ...]] = {
+    region: tuple(REGION_SPECIFIC_RESOLUTION[region][code] for code in CROSS_REGION_CODES)
+    for region in REGIONS
+}
+
 # ---------------------------------------------------------------------------
 # Multi-chunk topic groups (Property 3)
 # 10+ topics, each covered by 2-3 documents with partial information.
@@ -347,15 +411,24 @@ TITLE_TEMPLATES: dict[str, list[str]] = {
     ],
 }
 
-# Focused body paragraphs for multi-chunk docs
-MULTI_CHUNK_BODY_TEMPLATE: str = (
-    "This article focuses specifically on {focus} as part of the broader {topic_group_label} "
-    "workflow for the {region} region running {version}.\n\n"
-    "{detail_p1}\n\n"
-    "{detail_p2}\n\n"
-    "For related information, consult the other articles in this topic area. Together "
-    "they provide comprehensive coverage of {topic_group_label} for {region} {version}."
-)
+# Focused body paragraphs for multi-chunk docs (an f-string, so rendering
+# compiles to a single string build rather than a str.format call)
+def _multi_chunk_body(
+    focus: str,
+    topic_group_label: str,
+    region: str,
+    version: str,
+    detail_p1: str,
+    detail_p2: str,
+) -> str:
+    return (
+        f"This article focuses specifically on {focus} as part of the broader {topic_group_label} "
+        f"workflow for the {region} region running {version}.\n\n"
+        f"{detail_p1}\n\n"
+        f"{detail_p2}\n\n"
+        "For related information, consult the other articles in this topic area. Together "
+        f"they provide comprehensive coverage of {topic_group_label} for {region} {version}."
+    )
 
 MULTI_CHUNK_DETAIL_BANK: dict[str, list[str]] = {
     "authentication": [
@@ -396,206 +469,308 @@ MULTI_CHUNK_DETAIL_BANK: dict[str, list[str]] = {
 # session issues) but with different error codes, so dense search retrieves
 # them instead of the exact match while BM25 still finds E-4012.
 # ---------------------------------------------------------------------------
-DISTRACTOR_DOCS: list[dict[str, Any]] = [
-    {
-        "title": "Authentication Stack Timeout Troubleshooting",
-        "category": "networking",
-        "region": "EU",
-        "version": "v2.0",
-        "error_codes": ["E-4011"],
-        "body": (
-            "When the authentication stack times out in the EU region, users typically "
-            "see intermittent login failures and session drops. The root cause is often "
-            "related to the network layer between the authentication proxy and the identity "
-            "provider. Check the connection pool settings and ensure that the timeout "
-            "threshold is set to at least 30 seconds for EU deployments.\n\n"
-            "To diagnose, enable verbose logging on the EU authentication gateway and look "
-            "for connection timeout entries in /var/log/net/eu/auth-proxy.log. If timeouts "
-            "correlate with peak traffic, consider scaling the authentication stack horizontally "
-            "using the EU auto-scaling group configuration."
-        ),
-    },
-    {
-        "title": "Session Token Expiry During Authentication",
-        "category": "authentication",
-        "region": "EU",
-        "version": "v3.0",
-        "error_codes": ["E-1003"],
-        "body": (
-            "Session tokens may expire prematurely during the authentication handshake in the "
-            "EU region, causing users to see timeout errors. This typically occurs when the "
-            "token TTL is shorter than the authentication round-trip time, especially during "
-            "cross-region identity federation.\n\n"
-            "To resolve, increase the session token TTL in the EU authentication configuration "
-            "from the default 60 seconds to 120 seconds. Also verify that the system clock on "
-            "the EU auth servers is synchronized via NTP, as clock skew is a common cause of "
-            "premature token expiry and authentication timeouts."
-        ),
-    },
-    {
-        "title": "Resolving Network Authentication Gateway Timeouts",
-        "category": "networking",
-        "region": "EU",
-        "version": "v2.0",
-        "error_codes": ["E-4013"],
-        "body": (
-            "Network authentication gateway timeouts in the EU region indicate that the "
-            "gateway cannot complete the authentication handshake within the configured "
-            "timeout window. This is distinct from application-level auth failures — the "
-            "network layer itself is failing to route the authentication request.\n\n"
-            "Check the EU gateway health dashboard for connection queue depth and latency "
-            "metrics. If the gateway is overloaded, redistribute traffic across the EU "
-            "edge nodes. Ensure that the authentication backend is reachable from the "
-            "gateway subnet and that no firewall rules are blocking the auth traffic."
-        ),
-    },
-    {
-        "title": "EU Authentication Service Latency and Timeout Issues",
-        "category": "networking",
-        "region": "EU",
-        "version": "v3.0",
-        "error_codes": [],
-        "body": (
-            "The EU authentication service has known latency characteristics due to the "
-            "multi-hop architecture required for GDPR compliance. Authentication requests "
-            "traverse the EU privacy proxy before reaching the identity store, adding "
-            "15-40ms of latency. Under load, this can push total authentication time "
-            "beyond timeout thresholds.\n\n"
-            "Recommended mitigations: enable connection keep-alive on the EU auth proxy, "
-            "increase the client-side timeout to 45 seconds, and configure retry with "
-            "exponential backoff. For persistent timeout issues, check the EU privacy "
-            "proxy logs for queue saturation indicators."
-        ),
-    },
-    {
-        "title": "Authentication Timeout After Stack Upgrade",
-        "category": "networking",
-        "region": "US",
-        "version": "v3.0",
-        "error_codes": ["E-4009"],
-        "body": (
-            "After upgrading the authentication stack to a new version, users may experience "
-            "timeout errors during login. This is commonly caused by stale session caches "
-            "that reference the old authentication endpoints. The upgraded stack expects "
-            "connections on new ports or paths that the cached configuration does not reflect.\n\n"
-            "To fix, clear the authentication session cache on all regional nodes. For US "
-            "deployments, run `auth-cache --flush --region us` on the management host. "
-            "Verify that the load balancer health checks have been updated to probe the "
-            "new authentication endpoints."
-        ),
-    },
-]
+@functools.cache
+def _build_distractor_docs() -> list[dict[str, Any]]:
+    """Return the distractor document specs, built on first use."""
+    return [
+        {
+            "title": "Authentication Stack Timeout Troubleshooting",
+            "category": "networking",
+            "region": "EU",
+            "version": "v2.0",
+            "error_codes": ["E-4011"],
+            "body": (
+                "When the authentication stack times out in the EU region, users typically "
+                "see intermittent login failures and session drops. The root cause is often "
+                "related to the network layer between the authentication proxy and the identity "
+                "provider. Check the connection pool settings and ensure that the timeout "
+                "threshold is set to at least 30 seconds for EU deployments.\n\n"
+                "To diagnose, enable verbose logging on the EU authentication gateway and look "
+                "for connection timeout entries in /var/log/net/eu/auth-proxy.log. If timeouts "
+                "correlate with peak traffic, consider scaling the authentication stack horizontally "
+                "using the EU auto-scaling group configuration."
+            ),
+        },
+        {
+            "title": "Session Token Expiry During Authentication",
+            "category": "authentication",
+            "region": "EU",
+            "version": "v3.0",
+            "error_codes": ["E-1003"],
+            "body": (
+                "Session tokens may expire prematurely during the authentication handshake in the "
+                "EU region, causing users to see timeout errors. This typically occurs when the "
+                "token TTL is shorter than the authentication round-trip time, especially during "
+                "cross-region identity federation.\n\n"
+                "To resolve, increase the session token TTL in the EU authentication configuration "
+                "from the default 60 seconds to 120 seconds. Also verify that the system clock on "
+                "the EU auth servers is synchronized via NTP, as clock skew is a common cause of "
+                "premature token expiry and authentication timeouts."
+            ),
+        },
+        {
+            "title": "Resolving Network Authentication Gateway Timeouts",
+            "category": "networking",
+            "region": "EU",
+            "version": "v2.0",
+            "error_codes": ["E-4013"],
+            "body": (
+                "Network authentication gateway timeouts in the EU region indicate that the "
+                "gateway cannot complete the authentication handshake within the configured "
+                "timeout window. This is distinct from application-level auth failures — the "
+                "network layer itself is failing to route the authentication request.\n\n"
+                "Check the EU gateway health dashboard for connection queue depth and latency "
+                "metrics. If the gateway is overloaded, redistribute traffic across the EU "
+                "edge nodes. Ensure that the authentication backend is reachable from the "
+                "gateway subnet and that no firewall rules are blocking the auth traffic."
+            ),
+        },
+        {
+            "title": "EU Authentication Service Latency and Timeout Issues",
+            "category": "networking",
+            "region": "EU",
+            "version": "v3.0",
+            "error_codes": [],
+            "body": (
+                "The EU authentication service has known latency characteristics due to the "
+                "multi-hop architecture required for GDPR compliance. Authentication requests "
+                "traverse the EU privacy proxy before reaching the identity store, adding "
+                "15-40ms of latency. Under load, this can push total authentication time "
+                "beyond timeout thresholds.\n\n"
+                "Recommended mitigations: enable connection keep-alive on the EU auth proxy, "
+                "increase the client-side timeout to 45 seconds, and configure retry with "
+                "exponential backoff. For persistent timeout issues, check the EU privacy "
+                "proxy logs for queue saturation indicators."
+            ),
+        },
+        {
+            "title": "Authentication Timeout After Stack Upgrade",
+            "category": "networking",
+            "region": "US",
+            "version": "v3.0",
+            "error_codes": ["E-4009"],
+            "body": (
+                "After upgrading the authentication stack to a new version, users may experience "
+                "timeout errors during login. This is commonly caused by stale session caches "
+                "that reference the old authentication endpoints. The upgraded stack expects "
+                "connections on new ports or paths that the cached configuration does not reflect.\n\n"
+                "To fix, clear the authentication session cache on all regional nodes. For US "
+                "deployments, run `auth-cache --flush --region us` on the management host. "
+                "Verify that the load balancer health checks have been updated to probe the "
+                "new authentication endpoints."
+            ),
+        },
+    ]
+
+
+def _compile_paragraph(template: str, region: str, version: str) -> tuple[str, ...]:
+    """Render *template* for one region/version, split around ``{resolution}``."""
+    values = {"region": region, "version": version, "region_lower": region.lower()}
+    segments = [""]
+    for literal, field, _spec, _conversion in string.Formatter().parse(template):
+        segments[-1] += literal
+        if field == "resolution":
+            segments.append("")
+        elif field is not None:
+            segments[-1] += values[field]
+    return tuple(segments)
+
+
+# Body paragraphs pre-formatted for every (category, region, version,
+# paragraph index). Only ``{resolution}`` varies per article, so each entry
+# holds the literal segments around it and is completed with
+# ``resolution.join(segments)``.
+_BODY_CACHE: dict[tuple[str, str, str, int], tuple[str, ...]] = {
+    (category, region, version, i): _compile_paragraph(template, region, version)
+    for category, templates in BODY_TEMPLATES.items()
+    for region in REGIONS
+    for version in VERSIONS
+    for i, template in enumerate(templates)
+}
+
+
+_TITLE_FIELDS = frozenset({"error_code", "region", "version"})
+
+
+def _compile_title(template: str) -> Callable[[str, str, str], str]:
+    """Compile a title template into an equivalent f-string function.
+
+    The template is checked with ``string.Formatter`` first: only bare
+    ``{error_code}``, ``{region}`` and ``{version}`` fields are allowed, so the
+    generated source can contain nothing but those names and literals.
+    """
+    for _literal, field, spec, conversion in string.Formatter().parse(template):
+        if field is not None and (field not in _TITLE_FIELDS or spec or conversion):
+            raise ValueError(f"Unsupported title field {field!r} in {template!r}")
+    source = f"lambda error_code, region, version: f{template!r}"
+    return eval(source, {"__builtins__": {}})
+
+
+# TITLE_TEMPLATES compiled once, index-aligned with each category's list
+_TITLE_RENDERERS: dict[str, list[Callable[[str, str, str], str]]] = {
+    category: [_compile_title(template) for template in templates]
+    for category, templates in TITLE_TEMPLATES.items()
+}
+
+
+# ---------------------------------------------------------------------------
+# Article record
+# ---------------------------------------------------------------------------
+@dataclass(slots=True)
+class Article:
+    """One generated KB article. Field order is the key order in the JSON."""
+
+    doc_id: str
+    title: str
+    body: str
+    region: str
+    product_version: str
+    effective_date: date  # serialized as YYYY-MM-DD by orjson
+    error_codes: list[str]
+    category: str
+    deprecated: bool
+    topic_group: str | None
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
-def _random_date(rng: random.Random, version: str) -> str:
-    """Return a random ISO date within the version's date range."""
-    start, end = VERSION_DATE_RANGES[version]
-    delta = (end - start).days
-    return (start + timedelta(days=rng.randint(0, delta))).isoformat()
+def _random_date(rng: random.Random, version: str) -> date:
+    """Return a random date within the version's date range."""
+    return rng.choice(_DATE_POOL[version])
 
 
 def _pick_error_codes(rng: random.Random, category: str, count: int) -> list[str]:
-    """Pick *count* random error codes from the category pool."""
-    pool = ERROR_CODES[category]
-    return sorted(rng.sample(pool, min(count, len(pool))))
+    """Pick *count* random error codes from the category pool.
+
+    Samples positions rather than codes: each pool is in ascending code
+    order, so sorting the ints gives the same result as sorting the strings.
+    """
+    if count <= 0:
+        # sample(..., 0) draws nothing from the stream, so skip the call
+        return []
+    pool = _CODE_POOLS[category]
+    indices = rng.sample(range(len(pool)), min(count, len(pool)))
+    return [pool[i] for i in sorted(indices)]
+
+
+@functools.cache
+def _fill_paragraph(
+    category: str, index: int, region: str, version: str, resolution: str
+) -> str:
+    """Complete one cached body paragraph with *resolution*.
+
+    Phase 2 and Phase 4 reuse a handful of fixed resolutions, so most calls
+    hit the cache and share the paragraph string.
+    """
+    return resolution.join(_BODY_CACHE[(category, region, version, index)])
 
 
 def _format_body(
-    paragraphs: list[str],
+    category: str,
+    paragraph_indices: list[int],
     region: str,
     version: str,
     resolution: str,
 ) -> str:
-    """Format body paragraphs with region/version/resolution substitution."""
-    filled = []
-    for p in paragraphs:
-        filled.append(
-            p.format(
-                region=region,
-                version=version,
-                region_lower=region.lower(),
-                resolution=resolution,
-            )
-        )
-    return "\n\n".join(filled)
+    """Assemble body paragraphs from the cache and substitute the resolution."""
+    return "\n\n".join(
+        [_fill_paragraph(category, i, region, version, resolution) for i in paragraph_indices]
+    )
+
+
+@functools.cache
+def _fill_detail(category: str, index: int, region: str, version: str) -> str:
+    """Format one multi-chunk detail paragraph.
+
+    Cached so documents that draw the same paragraph for the same region and
+    version share a single string object.
+    """
+    return MULTI_CHUNK_DETAIL_BANK[category][index].format(
+        region=region, version=version, region_lower=region.lower()
+    )
+
+
+def _index_code_regions(articles: list[Article]) -> dict[str, set[str]]:
+    """Map each error code to the set of regions whose articles cite it."""
+    code_regions: defaultdict[str, set[str]] = defaultdict(set)
+    for a in articles:
+        region = a.region
+        for code in a.error_codes:
+            code_regions[code].add(region)
+    return code_regions
 
 
 # ---------------------------------------------------------------------------
 # Main generation logic
 # ---------------------------------------------------------------------------
-def generate_articles() -> list[dict[str, Any]]:
+def generate_articles() -> list[Article]:
     """Generate 200 KB articles with all required data properties."""
     rng = random.Random(SEED)
-    articles: list[dict[str, Any]] = []
-    doc_counter = 1
-
-    def _next_doc_id() -> str:
-        nonlocal doc_counter
-        did = f"KB-{doc_counter:04d}"
-        doc_counter += 1
-        return did
+    # Bound once; these are called for nearly every article
+    rng_choice = rng.choice
+    rng_randint = rng.randint
+    rng_sample = rng.sample
+    # The final count is fixed, so fill preallocated slots instead of appending
+    articles: list[Article] = [None] * NUM_ARTICLES  # type: ignore[list-item]
+    n = 0  # number of slots filled so far
 
     # ------------------------------------------------------------------
     # Phase 1: Cross-region error code articles (Property 1)
     # 10 codes x 3 regions = 30 articles
     # ------------------------------------------------------------------
-    for error_code in CROSS_REGION_CODES:
-        # Determine category from error code prefix
-        code_num = int(error_code.split("-")[1])
-        if code_num < 2000:
-            category = "authentication"
-        elif code_num < 3000:
-            category = "billing"
-        elif code_num < 4000:
-            category = "deployment"
-        else:
-            category = "networking"
+    for code_index, error_code in enumerate(CROSS_REGION_CODES):
+        category = _CODE_TO_CATEGORY[error_code]
+        title_prefix = f"Resolving {error_code}: {category.title()} Issue in "
+        num_templates = len(BODY_TEMPLATES[category])
 
         for region in REGIONS:
-            version = rng.choice(VERSIONS)
-            resolution = REGION_SPECIFIC_RESOLUTION[region][error_code]
-            title = f"Resolving {error_code}: {category.title()} Issue in {region}"
+            version = rng_choice(VERSIONS)
+            resolution = _RES_BY_REGION[region][code_index]
+            title = title_prefix + region
 
-            body_templates = BODY_TEMPLATES[category]
             # Pick 2-3 paragraphs
-            num_paragraphs = rng.randint(2, 4)
-            selected = rng.sample(body_templates, min(num_paragraphs, len(body_templates)))
-            body = _format_body(selected, region, version, resolution)
-
-            articles.append({
-                "doc_id": _next_doc_id(),
-                "title": title,
-                "body": body,
-                "region": region,
-                "product_version": version,
-                "effective_date": _random_date(rng, version),
-                "error_codes": [error_code],
-                "category": category,
-                "deprecated": False,
-                "topic_group": None,
-            })
+            num_paragraphs = rng_randint(2, 4)
+            selected = rng_sample(range(num_templates), min(num_paragraphs, num_templates))
+            body = _format_body(category, selected, region, version, resolution)
+
+            articles[n] = Article(
+                doc_id=_DOC_IDS[n],
+                title=title,
+                body=body,
+                region=region,
+                product_version=version,
+                effective_date=_random_date(rng, version),
+                error_codes=[error_code],
+                category=category,
+                deprecated=False,
+                topic_group=None,
+            )
+            n += 1
 
     # ------------------------------------------------------------------
     # Phase 1b: Distractor documents for dense search confusion
     # These are semantically close to the Demo 1 query but have different
     # error codes, ensuring dense search ranks them above the true match.
     # ------------------------------------------------------------------
-    for distractor in DISTRACTOR_DOCS:
-        articles.append({
-            "doc_id": _next_doc_id(),
-            "title": distractor["title"],
-            "body": distractor["body"],
-            "region": distractor["region"],
-            "product_version": distractor["version"],
-            "effective_date": _random_date(rng, distractor["version"]),
-            "error_codes": distractor["error_codes"],
-            "category": distractor["category"],
-            "deprecated": False,
-            "topic_group": None,
-        })
+    distractors = _build_distractor_docs()
+    # One draw per doc and no other state, so fill the block in one go
+    articles[n:n + len(distractors)] = [
+        Article(
+            doc_id=doc_id,
+            title=distractor["title"],
+            body=distractor["body"],
+            region=distractor["region"],
+            product_version=distractor["version"],
+            effective_date=_random_date(rng, distractor["version"]),
+            error_codes=distractor["error_codes"],
+            category=distractor["category"],
+            deprecated=False,
+            topic_group=None,
+        )
+        for doc_id, distractor in zip(_DOC_IDS[n:], distractors)
+    ]
+    n += len(distractors)
 
     # ------------------------------------------------------------------
     # Phase 2: Deprecated articles with replacements (Property 2)
@@ -606,65 +781,62 @@ def generate_articles() -> list[dict[str, Any]]:
     # but that's a lot. Instead: 30 deprecated docs, and their replacements
     # come from other phases or are created here as 30 non-deprecated docs.
     # ------------------------------------------------------------------
-    deprecated_pairs: list[tuple[dict[str, Any], dict[str, Any]]] = []
     for i in range(30):
         category = CATEGORIES[i % 4]
         region = REGIONS[i % 3]
         # Deprecated doc is v1.0 or v2.0, replacement is one version newer
-        old_version = "v1.0" if i % 2 == 0 else "v2.0"
-        new_version = "v2.0" if old_version == "v1.0" else "v3.0"
+        old_version = VERSIONS[0] if i % 2 == 0 else VERSIONS[1]
+        new_version = VERSIONS[1] if old_version == VERSIONS[0] else VERSIONS[2]
 
-        error_code_count = rng.randint(0, 2)
+        error_code_count = rng_randint(0, 2)
         codes = _pick_error_codes(rng, category, error_code_count)
 
-        base_title_pool = TITLE_TEMPLATES[category]
-        title_template = base_title_pool[i % len(base_title_pool)]
+        base_title_pool = _TITLE_RENDERERS[category]
+        render_title = base_title_pool[i % len(base_title_pool)]
         code_for_title = codes[0] if codes else f"E-{1001 + i % 10}"
-        old_title = title_template.format(
-            error_code=code_for_title, region=region, version=old_version
-        )
+        old_title = render_title(code_for_title, region, old_version)
         new_title = old_title.replace(old_version, new_version)
         if old_title == new_title:
             new_title = f"[Updated] {old_title}"
 
-        body_templates = BODY_TEMPLATES[category]
-        selected = rng.sample(body_templates, rng.randint(2, 3))
+        num_templates = len(BODY_TEMPLATES[category])
+        selected = rng_sample(range(num_templates), rng_randint(2, 3))
         old_body = _format_body(
-            selected, region, old_version,
+            category, selected, region, old_version,
             "Follow the standard resolution procedure for this version."
         )
         new_body = _format_body(
-            selected, region, new_version,
+            category, selected, region, new_version,
             "This updated procedure replaces the previous version's workflow."
         )
 
-        deprecated_doc = {
-            "doc_id": _next_doc_id(),
-            "title": old_title,
-            "body": old_body,
-            "region": region,
-            "product_version": old_version,
-            "effective_date": _random_date(rng, old_version),
-            "error_codes": codes,
-            "category": category,
-            "deprecated": True,
-            "topic_group": None,
-        }
-        replacement_doc = {
-            "doc_id": _next_doc_id(),
-            "title": new_title,
-            "body": new_body,
-            "region": region,
-            "product_version": new_version,
-            "effective_date": _random_date(rng, new_version),
-            "error_codes": codes,
-            "category": category,
-            "deprecated": False,
-            "topic_group": None,
-        }
-        articles.append(deprecated_doc)
-        articles.append(replacement_doc)
-        deprecated_pairs.append((deprecated_doc, replacement_doc))
+        deprecated_doc = Article(
+            doc_id=_DOC_IDS[n],
+            title=old_title,
+            body=old_body,
+            region=region,
+            product_version=old_version,
+            effective_date=_random_date(rng, old_version),
+            error_codes=codes,
+            category=category,
+            deprecated=True,
+            topic_group=None,
+        )
+        replacement_doc = Article(
+            doc_id=_DOC_IDS[n + 1],
+            title=new_title,
+            body=new_body,
+            region=region,
+            product_version=new_version,
+            effective_date=_random_date(rng, new_version),
+            error_codes=codes,
+            category=category,
+            deprecated=False,
+            topic_group=None,
+        )
+        articles[n] = deprecated_doc
+        articles[n + 1] = replacement_doc
+        n += 2
 
     # ------------------------------------------------------------------
     # Phase 3: Multi-chunk topic articles (Property 3)
@@ -676,89 +848,90 @@ def generate_articles() -> list[dict[str, Any]]:
         topic_group_label = topic_group.replace("_", " ")
 
         for doc_spec in topic["docs"]:
-            region = rng.choice(REGIONS)
-            version = rng.choice(VERSIONS)
+            region = rng_choice(REGIONS)
+            version = rng_choice(VERSIONS)
             title = f"{doc_spec['title_suffix']} — {topic_group_label.title()} Guide"
 
             # Build body from focused template
-            detail_pool = MULTI_CHUNK_DETAIL_BANK[category]
-            detail_paragraphs = rng.sample(detail_pool, min(2, len(detail_pool)))
-            body = MULTI_CHUNK_BODY_TEMPLATE.format(
-                focus=doc_spec["focus"],
-                topic_group_label=topic_group_label,
-                region=region,
-                version=version,
-                detail_p1=detail_paragraphs[0].format(
-                    region=region, version=version, region_lower=region.lower()
-                ),
-                detail_p2=detail_paragraphs[1].format(
-                    region=region, version=version, region_lower=region.lower()
-                ),
+            pool_size = len(MULTI_CHUNK_DETAIL_BANK[category])
+            detail_indices = rng_sample(range(pool_size), min(2, pool_size))
+            body = _multi_chunk_body(
+                doc_spec["focus"],
+                topic_group_label,
+                region,
+                version,
+                _fill_detail(category, detail_indices[0], region, version),
+                _fill_detail(category, detail_indices[1], region, version),
             )
 
-            error_code_count = rng.randint(0, 1)
+            error_code_count = rng_randint(0, 1)
             codes = _pick_error_codes(rng, category, error_code_count)
 
-            articles.append({
-                "doc_id": _next_doc_id(),
-                "title": title,
-                "body": body,
-                "region": region,
-                "product_version": version,
-                "effective_date": _random_date(rng, version),
-                "error_codes": codes,
-                "category": category,
-                "deprecated": False,
-                "topic_group": topic_group,
-            })
+            articles[n] = Article(
+                doc_id=_DOC_IDS[n],
+                title=title,
+                body=body,
+                region=region,
+                product_version=version,
+                effective_date=_random_date(rng, version),
+                error_codes=codes,
+                category=category,
+                deprecated=False,
+                topic_group=topic_group,
+            )
+            n += 1
 
     # ------------------------------------------------------------------
     # Phase 4: Fill remaining articles to reach 200
     # Distribute evenly across categories and regions
     # ------------------------------------------------------------------
-    remaining = NUM_ARTICLES - len(articles)
-    cat_counts = {c: sum(1 for a in articles if a["category"] == c) for c in CATEGORIES}
+    remaining = NUM_ARTICLES - n
+    # Min-heap of (count, category). CATEGORIES is alphabetical, so ties pop
+    # in the same order min() over CATEGORIES would pick them.
+    cat_heap = [
+        (sum(1 for a in articles[:n] if a.category == c), c) for c in CATEGORIES
+    ]
+    heapq.heapify(cat_heap)
 
     for i in range(remaining):
         # Pick the category with the fewest articles so far
-        category = min(CATEGORIES, key=lambda c: cat_counts[c])
+        count, category = cat_heap[0]
+        heapq.heapreplace(cat_heap, (count + 1, category))
         region = REGIONS[i % 3]
         version = VERSIONS[i % 3]
 
-        error_code_count = rng.randint(0, 3)
+        error_code_count = rng_randint(0, 3)
         codes = _pick_error_codes(rng, category, error_code_count)
 
-        title_pool = TITLE_TEMPLATES[category]
-        title_template = title_pool[i % len(title_pool)]
+        title_pool = _TITLE_RENDERERS[category]
+        render_title = title_pool[i % len(title_pool)]
         code_for_title = codes[0] if codes else f"E-{1001 + (i * 7) % 40}"
-        title = title_template.format(
-            error_code=code_for_title, region=region, version=version
-        )
+        title = render_title(code_for_title, region, version)
 
-        body_templates = BODY_TEMPLATES[category]
-        num_paragraphs = rng.randint(2, 4)
-        selected = rng.sample(body_templates, min(num_paragraphs, len(body_templates)))
+        num_templates = len(BODY_TEMPLATES[category])
+        num_paragraphs = rng_randint(2, 4)
+        selected = rng_sample(range(num_templates), min(num_paragraphs, num_templates))
         resolution = "Follow the documented resolution steps for your environment."
-        body = _format_body(selected, region, version, resolution)
-
-        articles.append({
-            "doc_id": _next_doc_id(),
-            "title": title,
-            "body": body,
-            "region": region,
-            "product_version": version,
-            "effective_date": _random_date(rng, version),
-            "error_codes": codes,
-            "category": category,
-            "deprecated": False,
-            "topic_group": None,
-        })
-        cat_counts[category] += 1
+        body = _format_body(category, selected, region, version, resolution)
+
+        articles[n] = Article(
+            doc_id=_DOC_IDS[n],
+            title=title,
+            body=body,
+            region=region,
+            product_version=version,
+            effective_date=_random_date(rng, version),
+            error_codes=codes,
+            category=category,
+            deprecated=False,
+            topic_group=None,
+        )
+        n += 1
 
     return articles
 
 
-def generate_eval_set(articles: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def generate_eval_set(articles: list[Article]) -> list[dict[str, Any]]:
     """Generate 20 eval queries referencing real doc_ids from the dataset.
 
     Categories:
@@ -778,21 +951,28 @@ def generate_eval_set(articles: list[dict[str, Any]]) -> list[dict[str, Any]]:
         return qid
 
     # Index helpers
-    by_error_region: dict[tuple[str, str], list[dict]] = {}
-    by_topic_group: dict[str, list[dict]] = {}
-    deprecated_docs: list[dict] = []
-    non_deprecated: list[dict] = []
+    by_error_region: defaultdict[tuple[str, str], list[Article]] = defaultdict(list)
+    by_topic_group: defaultdict[str, list[Article]] = defaultdict(list)
+    deprecated_docs: list[Article] = []
+    # Non-deprecated docs grouped by (region, version, category), by
+    # (category, region) and by category, each in article order
+    by_rvc: defaultdict[tuple[str, str, str], list[Article]] = defaultdict(list)
+    by_cat_region: defaultdict[tuple[str, str], list[Article]] = defaultdict(list)
+    by_cat: defaultdict[str, list[Article]] = defaultdict(list)
 
     for a in articles:
-        if a["deprecated"]:
+        region = a.region
+        if a.deprecated:
             deprecated_docs.append(a)
         else:
-            non_deprecated.append(a)
-        for code in a["error_codes"]:
-            key = (code, a["region"])
-            by_error_region.setdefault(key, []).append(a)
-        if a.get("topic_group"):
-            by_topic_group.setdefault(a["topic_group"], []).append(a)
+            category = a.category
+            by_rvc[(region, a.product_version, category)].append(a)
+            by_cat_region[(category, region)].append(a)
+            by_cat[category].append(a)
+        for code in a.error_codes:
+            by_error_region[(code, region)].append(a)
+        if a.topic_group:
+            by_topic_group[a.topic_group].append(a)
 
     # --- exact_match (5) ---
     # Pick cross-region codes where we know the exact region doc
@@ -803,14 +983,14 @@ def generate_eval_set(articles: list[dict[str, Any]]) -> list[dict[str, Any]]:
     for code, region in exact_match_picks:
         matches = [
             a for a in by_error_region.get((code, region), [])
-            if not a["deprecated"]
+            if not a.deprecated
         ]
         if matches:
             doc = matches[0]
             eval_queries.append({
                 "query_id": _next_query_id(),
                 "query": f"How do I fix error {code} in the {region} region?",
-                "expected_doc_ids": [doc["doc_id"]],
+                "expected_doc_ids": [doc.doc_id],
                 "expected_filters": {"region": region, "error_codes": code},
                 "category": "exact_match",
             })
@@ -824,12 +1004,7 @@ def generate_eval_set(articles: list[dict[str, Any]]) -> list[dict[str, Any]]:
         {"region": "US", "version": "v3.0", "category": "authentication"},
     ]
     for spec in scoped_specs:
-        matches = [
-            a for a in non_deprecated
-            if a["region"] == spec["region"]
-            and a["product_version"] == spec["version"]
-            and a["category"] == spec["category"]
-        ]
+        matches = by_rvc.get((spec["region"], spec["version"], spec["category"]), [])
         if matches:
             doc = matches[0]
             eval_queries.append({
@@ -838,7 +1013,7 @@ def generate_eval_set(articles: list[dict[str, Any]]) -> list[dict[str, Any]]:
                     f"What are the {spec['category']} procedures for "
                     f"{spec['region']} on {spec['version']}?"
                 ),
-                "expected_doc_ids": [doc["doc_id"]],
+                "expected_doc_ids": [doc.doc_id],
                 "expected_filters": {
                     "region": spec["region"],
                     "product_version": spec["version"],
@@ -856,7 +1031,7 @@ def generate_eval_set(articles: list[dict[str, Any]]) -> list[dict[str, Any]]:
             eval_queries.append({
                 "query_id": _next_query_id(),
                 "query": f"Give me a complete guide on {topic_label}.",
-                "expected_doc_ids": [d["doc_id"] for d in docs],
+                "expected_doc_ids": [d.doc_id for d in docs],
                 "expected_filters": {},
                 "category": "multi_doc",
             })
@@ -869,11 +1044,11 @@ def generate_eval_set(articles: list[dict[str, Any]]) -> list[dict[str, Any]]:
     ]
     broad_categories = ["deployment", "billing", "networking"]
     for query_text, cat in zip(broad_queries, broad_categories):
-        matches = [a for a in non_deprecated if a["category"] == cat][:3]
+        matches = by_cat.get(cat, [])[:3]
         eval_queries.append({
             "query_id": _next_query_id(),
             "query": query_text,
-            "expected_doc_ids": [m["doc_id"] for m in matches],
+            "expected_doc_ids": [m.doc_id for m in matches],
             "expected_filters": {},
             "category": "broad",
         })
@@ -885,101 +1060,104 @@ def generate_eval_set(articles: list[dict[str, Any]]) -> list[dict[str, Any]]:
     for dep in deprecated_docs:
         if dep_trap_count >= 3:
             break
-        if dep["category"] in seen_categories:
+        if dep.category in seen_categories:
             continue
         # Find a non-deprecated doc with similar category + region
-        replacements = [
-            a for a in non_deprecated
-            if a["category"] == dep["category"]
-            and a["region"] == dep["region"]
-            and not a["deprecated"]
-        ]
+        replacements = by_cat_region.get((dep.category, dep.region), [])
         if replacements:
             repl = replacements[0]
             eval_queries.append({
                 "query_id": _next_query_id(),
                 "query": (
-                    f"How do I handle {dep['category']} issues in "
-                    f"{dep['region']}? I need current documentation."
+                    f"How do I handle {dep.category} issues in "
+                    f"{dep.region}? I need current documentation."
                 ),
-                "expected_doc_ids": [repl["doc_id"]],
+                "expected_doc_ids": [repl.doc_id],
                 "expected_filters": {
-                    "region": dep["region"],
+                    "region": dep.region,
                     "deprecated": False,
                 },
                 "category": "deprecated_trap",
             })
-            seen_categories.add(dep["category"])
+            seen_categories.add(dep.category)
             dep_trap_count += 1
 
     return eval_queries
 
 
-def validate_articles(articles: list[dict[str, Any]]) -> None:
+def validate_articles(articles: list[Article]) -> None:
     """Validate all 6 required data properties. Raises ValueError on failure."""
     # Basic count
     assert len(articles) == NUM_ARTICLES, (
         f"Expected {NUM_ARTICLES} articles, got {len(articles)}"
     )
 
+    # Column views of the per-article fields the vectorized checks need
+    categories = np.array([a.category for a in articles])
+    deprecated = np.fromiter((a.deprecated for a in articles), dtype=bool, count=len(articles))
+    dates = np.array([a.effective_date for a in articles], dtype="datetime64[D]")
+    version_idx = np.fromiter(
+        (_VERSION_INDEX[a.product_version] for a in articles), dtype=np.intp, count=len(articles)
+    )
+
     # Property 1: Cross-region error code overlap
-    code_regions: dict[str, set[str]] = {}
-    for a in articles:
-        for code in a["error_codes"]:
-            code_regions.setdefault(code, set()).add(a["region"])
+    code_regions = _index_code_regions(articles)
     cross_region_count = sum(1 for regions in code_regions.values() if len(regions) >= 2)
     assert cross_region_count >= 8, (
         f"Cross-region overlap: {cross_region_count} codes in 2+ regions (need >= 8)"
     )
 
     # Property 2: Deprecated ratio ~15%
-    deprecated_count = sum(1 for a in articles if a["deprecated"])
+    deprecated_count = int(deprecated.sum())
     ratio = deprecated_count / len(articles)
     assert 0.10 <= ratio <= 0.20, (
         f"Deprecated ratio: {ratio:.2%} ({deprecated_count} docs) — expected 10-20%"
     )
 
     # Property 3: Multi-chunk topics
-    topic_groups = {}
+    topic_groups: defaultdict[str, list[str]] = defaultdict(list)
     for a in articles:
-        tg = a.get("topic_group")
+        tg = a.topic_group
         if tg:
-            topic_groups.setdefault(tg, []).append(a["doc_id"])
+            topic_groups[tg].append(a.doc_id)
     multi_chunk_count = sum(1 for docs in topic_groups.values() if len(docs) >= 2)
     assert multi_chunk_count >= 10, (
         f"Multi-chunk topics: {multi_chunk_count} (need >= 10)"
     )
 
     # Property 4: Version-date alignment
-    for a in articles:
-        version = a["product_version"]
-        eff_date = date.fromisoformat(a["effective_date"])
-        start, end = VERSION_DATE_RANGES[version]
-        assert start <= eff_date <= end, (
-            f"{a['doc_id']}: date {eff_date} outside range for {version} ({start}–{end})"
+    in_range = (dates >= _RANGE_STARTS[version_idx]) & (dates <= _RANGE_ENDS[version_idx])
+    if not in_range.all():
+        a = articles[int(np.argmin(in_range))]
+        start, end = VERSION_DATE_RANGES[a.product_version]
+        raise AssertionError(
+            f"{a.doc_id}: date {a.effective_date} outside range for "
+            f"{a.product_version} ({start}–{end})"
         )
 
     # Property 5: Category distribution (50 each, +/- 10)
-    cat_counts = {c: 0 for c in CATEGORIES}
-    for a in articles:
-        cat_counts[a["category"]] += 1
+    cat_counts = dict.fromkeys(CATEGORIES, 0)
+    names, counts = np.unique(categories, return_counts=True)
+    cat_counts.update(zip(names.tolist(), counts.tolist()))
     for cat, count in cat_counts.items():
         assert 40 <= count <= 60, (
             f"Category '{cat}' has {count} articles (expected 40-60)"
         )
 
     # Property 6: Error code pool
-    all_valid_codes = set()
-    for codes in ERROR_CODES.values():
-        all_valid_codes.update(codes)
-    for a in articles:
-        for code in a["error_codes"]:
-            assert code in all_valid_codes, (
-                f"{a['doc_id']} has invalid error code: {code}"
-            )
-        assert len(a["error_codes"]) <= 3, (
-            f"{a['doc_id']} has {len(a['error_codes'])} error codes (max 3)"
-        )
+    code_counts = np.fromiter(
+        (len(a.error_codes) for a in articles), dtype=np.intp, count=len(articles)
+    )
+    flat_codes = np.array([code for a in articles for code in a.error_codes], dtype=str)
+    valid = np.isin(flat_codes, _VALID_CODES)
+    if not valid.all():
+        first = int(np.argmin(valid))
+        owner = articles[int(np.searchsorted(np.cumsum(code_counts), first, side="right"))]
+        raise AssertionError(f"{owner.doc_id} has invalid error code: {flat_codes[first]}")
+    over_limit = code_counts > 3
+    if over_limit.any():
+        a = articles[int(np.argmax(over_limit))]
+        raise AssertionError(f"{a.doc_id} has {len(a.error_codes)} error codes (max 3)")
 
 
 def main() -> None:
@@ -991,18 +1169,22 @@ def main() -> None:
     validate_articles(articles)
     print("  All 6 data properties validated successfully.")
 
-    # Remove topic_group from final output (bookkeeping only, not indexed)
-    # Actually keep it in the JSON for eval set generation reference,
-    # but note it is NOT indexed in ChromaDB.
-    output_articles = []
-    for a in articles:
-        doc = dict(a)
-        # Keep topic_group in the output for bookkeeping
-        output_articles.append(doc)
+    # topic_group stays in the JSON for eval set generation reference,
+    # but note it is NOT indexed in ChromaDB. orjson serializes Article
+    # records directly, in field order.
+    KB_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    print(f"Writing {len(articles)} articles to {OUTPUT_PATH}")
+    kb_json = orjson.dumps(articles, option=_JSON_OPTIONS)
+    OUTPUT_PATH.write_bytes(kb_json)
+
+    # Compressed copy of the same bytes for readers that load the whole KB
+    print(f"Writing {len(articles)} articles to {ZSTD_OUTPUT_PATH}")
+    ZSTD_OUTPUT_PATH.write_bytes(zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(kb_json))
 
-    print(f"Writing {len(output_articles)} articles to {OUTPUT_PATH}")
-    with open(OUTPUT_PATH, "w") as f:
-        json.dump(output_articles, f, indent=2)
+    # Compact one-article-per-line copy for streaming consumers
+    print(f"Writing {len(articles)} articles to {JSONL_OUTPUT_PATH}")
+    with open(JSONL_OUTPUT_PATH, "wb") as f:
+        f.writelines(orjson.dumps(a) + b"\n" for a in articles)
 
     print("Generating eval set (20 queries)...")
     eval_set = generate_eval_set(articles)
@@ -1010,15 +1192,14 @@ def main() -> None:
 
     EVAL_OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
     print(f"Writing eval set to {EVAL_OUTPUT_PATH}")
-    with open(EVAL_OUTPUT_PATH, "w") as f:
-        json.dump(eval_set, f, indent=2)
+    EVAL_OUTPUT_PATH.write_bytes(orjson.dumps(eval_set, option=_JSON_OPTIONS))
 
     # Summary
     cat_counts = {c: 0 for c in CATEGORIES}
     for a in articles:
-        cat_counts[a["category"]] += 1
-    dep_count = sum(1 for a in articles if a["deprecated"])
-    topic_groups = set(a.get("topic_group") for a in articles if a.get("topic_group"))
+        cat_counts[a.category] += 1
+    dep_count = sum(1 for a in articles if a.deprecated)
+    topic_groups = set(a.topic_group for a in articles if a.topic_group)
 
     print("\n--- Dataset Summary ---")
     print(f"Total articles: {len(articles)}")
@@ -1026,10 +1207,7 @@ def main() -> None:
     print(f"Deprecated articles: {dep_count} ({dep_count/len(articles):.1%})")
     print(f"Multi-chunk topic groups: {len(topic_groups)}")
 
-    code_regions: dict[str, set[str]] = {}
-    for a in articles:
-        for code in a["error_codes"]:
-            code_regions.setdefault(code, set()).add(a["region"])
+    code_regions = _index_code_regions(articles)
     cross_region = sum(1 for r in code_regions.values() if len(r) >= 2)
     print(f"Cross-region error codes: {cross_region}")
 
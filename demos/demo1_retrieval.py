@@ -11,23 +11,28 @@ Run::
     uv run python -m demos.demo1_retrieval
 """
 
-import json
-from pathlib import Path
+from __future__ import annotations
 
+import functools
+import re
+from typing import TYPE_CHECKING
+
+import orjson
 from rich.console import Console
 
-from src.indexer import load_existing
-from src.reranker import Reranker
-from src.retriever import search_dense, search_hybrid, search_sparse
+from src.config import KB_PATH
 from src.utils import (
     print_results_table,
     prompt_query,
     wait_for_enter,
 )
 
-console = Console()
+# The indexer, retriever and reranker pull in chromadb and the embedding
+# client, so they are imported on first use rather than at startup.
+if TYPE_CHECKING:
+    from src.reranker import Reranker
 
-DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "kb_articles.json"
+console = Console()
 
 DEFAULT_QUERY = "authentication stack timeout error E-4011 in EU"
 
@@ -36,23 +41,21 @@ DEFAULT_QUERY = "authentication stack timeout error E-4011 in EU"
 # in the same "auth timeout" embedding neighbourhood but have wrong codes.
 TARGET_DOC_ID = "KB-0031"
 
+_ERROR_CODE_RE = re.compile(r"E-\d{4}")
+# Checked in this order; the first region named anywhere in the query wins
+_REGIONS = ("EU", "US", "APAC")
+
 
 def _find_target_doc_id(query: str) -> str | None:
     """Return the hardcoded target for the default query, or try to find one dynamically."""
-    import re as _re
-
     query_upper = query.upper()
 
-    code_match = _re.search(r"E-\d{4}", query_upper)
+    code_match = _ERROR_CODE_RE.search(query_upper)
     if not code_match:
         return None
     error_code = code_match.group()
 
-    region = None
-    for r in ("EU", "US", "APAC"):
-        if r in query_upper:
-            region = r
-            break
+    region = next((r for r in _REGIONS if r in query_upper), None)
     if region is None:
         return None
 
@@ -60,19 +63,30 @@ def _find_target_doc_id(query: str) -> str | None:
     if error_code == "E-4011" and region == "EU":
         return TARGET_DOC_ID
 
-    articles = json.loads(DATA_PATH.read_text())
-    for a in articles:
-        if (
-            error_code in a.get("error_codes", [])
-            and a.get("region") == region
-            and not a.get("deprecated", False)
-        ):
-            return a["doc_id"]
-    return None
+    return _current_doc_index().get((error_code, region))
+
+
+@functools.lru_cache(maxsize=1)
+def _current_doc_index() -> dict[tuple[str, str], str]:
+    """Map (error code, region) to the first non-deprecated doc_id citing it.
+
+    Loaded from the KB file on the first custom query and reused by the
+    rest of the interactive loop.
+    """
+    index: dict[tuple[str, str], str] = {}
+    for a in orjson.loads(KB_PATH.read_bytes()):
+        if a.get("deprecated", False):
+            continue
+        for code in a.get("error_codes", []):
+            # Keep the first match in file order, as the old linear scan did
+            index.setdefault((code, a.get("region")), a["doc_id"])
+    return index
 
 
 def run_demo(collection, bm25_index, query: str, reranker: Reranker) -> None:
     """Run a single retrieval comparison for the given query."""
+    from src.retriever import search_dense, search_hybrid, search_sparse
+
     target = _find_target_doc_id(query)
     if target:
         console.print(f"[bold]Expected doc:[/bold] [green]{target}[/green]\n")
@@ -138,6 +152,13 @@ def main() -> None:
     console.rule("[bold cyan]Demo 1 — Naive vs. Hybrid Retrieval[/bold cyan]")
     console.print()
 
+    # Ask for the query before loading the heavy modules, so leaving at the
+    # first prompt does not pay for chromadb and the model clients
+    query = prompt_query(DEFAULT_QUERY)
+
+    from src.indexer import load_existing
+    from src.reranker import Reranker
+
     # Load indices and reranker once
     collection, bm25_index = load_existing()
     console.print()
@@ -147,7 +168,6 @@ def main() -> None:
     console.print()
 
     # First run with default (or custom) query
-    query = prompt_query(DEFAULT_QUERY)
     run_demo(collection, bm25_index, query, reranker)
 
     # Interactive loop
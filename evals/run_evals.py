@@ -4,7 +4,8 @@ Loads the eval set and existing index, runs the full retrieval pipeline
 (filter extraction + hybrid search) on each query, and computes retrieval
 quality metrics: Recall@5, Recall@10, and MRR (Mean Reciprocal Rank).
 Results are printed as a per-category summary table and saved to
-``evals/results/run_TIMESTAMP.json``.
+``evals/results/run_TIMESTAMP.jsonl`` (one result per line) with the
+aggregate metrics in ``evals/results/run_TIMESTAMP_summary.json``.
 
 Run:
     uv run python -m evals.run_evals
@@ -12,65 +13,80 @@ Run:
 
 from __future__ import annotations
 
-import json
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+import httpx
+import numpy as np
+import orjson
+from openai import OpenAIError
 from rich import box
 from rich.console import Console
 from rich.table import Table
 
-from src.filter_extractor import convert_to_chromadb_where, extract_filters
+from src.filter_extractor import (
+    convert_to_chromadb_where,
+    extract_filters,
+    extract_filters_bulk,
+)
 from src.indexer import load_existing
-from src.retriever import search_hybrid
+from src.retriever import search_hybrid, search_hybrid_batch
 
 logger = logging.getLogger(__name__)
 console = Console()
 
 EVAL_SET_PATH = Path(__file__).resolve().parent / "eval_set.json"
 RESULTS_DIR = Path(__file__).resolve().parent / "results"
+_MAX_WORKERS = 16  # eval queries in flight at once
 
 
 # ---------------------------------------------------------------------------
 # Metrics
 # ---------------------------------------------------------------------------
 
-def recall_at_k(retrieved_ids: list[str], expected_ids: list[str], k: int) -> float:
-    """Compute Recall@k: fraction of expected doc_ids found in the top-k results.
+def score_results(results: list[dict[str, Any]]) -> None:
+    """Add Recall@5, Recall@10 and MRR to every result in one vectorized pass.
 
-    Args:
-        retrieved_ids: Ordered list of retrieved doc_ids.
-        expected_ids: List of expected (relevant) doc_ids.
-        k: Cutoff rank.
+    Builds an ``(n_queries, max_rank)`` boolean hit mask of retrieved doc_ids
+    that are expected, then reads every metric off it. Retrieved doc_ids are
+    unique within a query (RRF output), so hits in the top k count the
+    expected docs found there.
 
-    Returns:
-        Recall score between 0.0 and 1.0.
+    Args:
+        results: Per-query result dicts with ``retrieved_doc_ids`` and
+            ``expected_doc_ids``; updated in place.
     """
-    if not expected_ids:
-        return 1.0
-    top_k_set = set(retrieved_ids[:k])
-    found = sum(1 for eid in expected_ids if eid in top_k_set)
-    return found / len(expected_ids)
-
-
-def reciprocal_rank(retrieved_ids: list[str], expected_ids: list[str]) -> float:
-    """Compute Reciprocal Rank: 1/rank of the first relevant document.
+    n = len(results)
+    width = max((len(r["retrieved_doc_ids"]) for r in results), default=0)
+    hits = np.zeros((n, width), dtype=bool)
+    n_expected = np.empty(n)
+    for i, r in enumerate(results):
+        expected = set(r["expected_doc_ids"])
+        retrieved = r["retrieved_doc_ids"]
+        n_expected[i] = len(r["expected_doc_ids"])
+        hits[i, : len(retrieved)] = [doc_id in expected for doc_id in retrieved]
+
+    def recall(k: int) -> np.ndarray:
+        # Queries with no expected docs score 1.0
+        return np.divide(
+            hits[:, :k].sum(axis=1), n_expected, out=np.ones(n), where=n_expected > 0
+        )
 
-    Args:
-        retrieved_ids: Ordered list of retrieved doc_ids.
-        expected_ids: List of expected (relevant) doc_ids.
+    any_hit = hits.any(axis=1)
+    mrr = np.zeros(n)
+    if any_hit.any():
+        mrr[any_hit] = 1.0 / (hits[any_hit].argmax(axis=1) + 1)
 
-    Returns:
-        Reciprocal rank (0.0 if no relevant doc is found).
-    """
-    expected_set = set(expected_ids)
-    for i, doc_id in enumerate(retrieved_ids, start=1):
-        if doc_id in expected_set:
-            return 1.0 / i
-    return 0.0
+    for r, r_at_5, r_at_10, rr in zip(
+        results, recall(5).tolist(), recall(10).tolist(), mrr.tolist()
+    ):
+        r["recall_at_5"] = r_at_5
+        r["recall_at_10"] = r_at_10
+        r["mrr"] = rr
 
 
 # ---------------------------------------------------------------------------
@@ -93,57 +109,81 @@ def load_eval_set() -> list[dict[str, Any]]:
         )
         sys.exit(1)
 
-    with open(EVAL_SET_PATH) as f:
-        return json.load(f)
+    return orjson.loads(EVAL_SET_PATH.read_bytes())
 
 
 def run_eval_query(
     query_entry: dict[str, Any],
     collection: Any,
     bm25_index: Any,
+    filters: dict | None = None,
 ) -> dict[str, Any]:
-    """Run one eval query through the pipeline and compute metrics.
+    """Run one eval query through the pipeline.
+
+    Metrics are added afterwards for the whole run by ``score_results``.
 
     Args:
         query_entry: Eval query dict with ``query``, ``expected_doc_ids``, etc.
         collection: ChromaDB collection.
         bm25_index: BM25Index instance.
+        filters: Filters already extracted for this query (e.g. by
+            ``extract_filters_bulk``). Extracted here when None.
 
     Returns:
-        Result dict with query info, retrieved doc_ids, and per-query metrics.
+        Result dict with query info and retrieved doc_ids.
     """
-    query = query_entry["query"]
-    expected_ids = query_entry["expected_doc_ids"]
+    filters, where = _resolve_filters(query_entry["query"], filters)
+    results = search_hybrid(
+        collection, bm25_index, query_entry["query"], top_k=10, where=where or None
+    )
+    return _build_result(query_entry, filters, where, results)
+
+
+def _resolve_filters(query: str, filters: dict | None) -> tuple[dict, dict]:
+    """Extract filters for a query if needed and build its where clause.
+
+    Args:
+        query: The eval query text.
+        filters: Already-extracted filters, or None to extract them now.
 
-    # Extract filters
+    Returns:
+        Tuple of (filters, ChromaDB where clause); both are empty if
+        extraction or conversion fails.
+    """
     try:
-        filters = extract_filters(query)
-        where = convert_to_chromadb_where(filters)
+        if filters is None:
+            filters = extract_filters(query)
+        return filters, convert_to_chromadb_where(filters)
     except Exception:
         logger.warning("Filter extraction failed for %s; using no filters", query)
-        filters = {}
-        where = {}
+        return {}, {}
+
 
-    # Hybrid search
-    results = search_hybrid(collection, bm25_index, query, top_k=10, where=where or None)
-    retrieved_ids = [r["doc_id"] for r in results]
+def _build_result(
+    query_entry: dict[str, Any],
+    filters: dict,
+    where: dict,
+    results: list[dict],
+) -> dict[str, Any]:
+    """Assemble the per-query result record saved with the run.
 
-    # Metrics
-    r_at_5 = recall_at_k(retrieved_ids, expected_ids, k=5)
-    r_at_10 = recall_at_k(retrieved_ids, expected_ids, k=10)
-    rr = reciprocal_rank(retrieved_ids, expected_ids)
+    Args:
+        query_entry: Eval query dict.
+        filters: Filters used for the query.
+        where: ChromaDB where clause built from *filters*.
+        results: Hybrid search results for the query.
 
+    Returns:
+        Result dict with query info and retrieved doc_ids.
+    """
     return {
         "query_id": query_entry["query_id"],
-        "query": query,
+        "query": query_entry["query"],
         "category": query_entry["category"],
-        "expected_doc_ids": expected_ids,
+        "expected_doc_ids": query_entry["expected_doc_ids"],
         "extracted_filters": filters,
         "chromadb_where": where,
-        "retrieved_doc_ids": retrieved_ids,
-        "recall_at_5": r_at_5,
-        "recall_at_10": r_at_10,
-        "mrr": rr,
+        "retrieved_doc_ids": [r["doc_id"] for r in results],
     }
 
 
@@ -153,10 +193,15 @@ def print_summary(results: list[dict[str, Any]]) -> None:
     Args:
         results: List of per-query result dicts from ``run_eval_query``.
     """
-    # Aggregate by category
-    categories: dict[str, list[dict]] = {}
-    for r in results:
-        categories.setdefault(r["category"], []).append(r)
+    # Aggregate by category: one (n_queries, 3) metric matrix, summed per
+    # category with np.add.at (np.unique returns the categories sorted)
+    metrics = np.array([[r["recall_at_5"], r["recall_at_10"], r["mrr"]] for r in results])
+    categories, cat_index, cat_sizes = np.unique(
+        [r["category"] for r in results], return_inverse=True, return_counts=True
+    )
+    cat_sums = np.zeros((len(categories), metrics.shape[1]))
+    np.add.at(cat_sums, cat_index, metrics)
+    cat_means = cat_sums / cat_sizes[:, None]
 
     table = Table(
         title="Evaluation Results Summary",
@@ -169,21 +214,9 @@ def print_summary(results: list[dict[str, Any]]) -> None:
     table.add_column("Recall@10", justify="right", width=10)
     table.add_column("MRR", justify="right", width=10)
 
-    all_r5: list[float] = []
-    all_r10: list[float] = []
-    all_mrr: list[float] = []
-
-    for cat in sorted(categories):
-        cat_results = categories[cat]
-        n = len(cat_results)
-        avg_r5 = sum(r["recall_at_5"] for r in cat_results) / n
-        avg_r10 = sum(r["recall_at_10"] for r in cat_results) / n
-        avg_mrr = sum(r["mrr"] for r in cat_results) / n
-
-        all_r5.extend(r["recall_at_5"] for r in cat_results)
-        all_r10.extend(r["recall_at_10"] for r in cat_results)
-        all_mrr.extend(r["mrr"] for r in cat_results)
-
+    for cat, n, (avg_r5, avg_r10, avg_mrr) in zip(
+        categories.tolist(), cat_sizes.tolist(), cat_means.tolist()
+    ):
         table.add_row(
             cat,
             str(n),
@@ -194,12 +227,13 @@ def print_summary(results: list[dict[str, Any]]) -> None:
 
     # Overall row
     total_n = len(results)
+    overall_r5, overall_r10, overall_mrr = metrics.mean(axis=0).tolist()
     table.add_row(
         "[bold]OVERALL[/bold]",
         f"[bold]{total_n}[/bold]",
-        f"[bold]{sum(all_r5) / total_n:.3f}[/bold]",
-        f"[bold]{sum(all_r10) / total_n:.3f}[/bold]",
-        f"[bold]{sum(all_mrr) / total_n:.3f}[/bold]",
+        f"[bold]{overall_r5:.3f}[/bold]",
+        f"[bold]{overall_r10:.3f}[/bold]",
+        f"[bold]{overall_mrr:.3f}[/bold]",
         style="bold",
     )
 
@@ -208,65 +242,103 @@ def print_summary(results: list[dict[str, Any]]) -> None:
     console.print()
 
 
-def save_results(results: list[dict[str, Any]]) -> Path:
-    """Save detailed eval results to a timestamped JSON file.
+def save_results(results: list[dict[str, Any]]) -> tuple[Path, Path]:
+    """Save detailed eval results and summary stats to timestamped files.
+
+    Results are written as JSON Lines, one encoded result at a time, so
+    the encoder never holds more than a single row in memory.
 
     Args:
         results: List of per-query result dicts.
 
     Returns:
-        Path to the saved results file.
+        Tuple of (results JSONL path, summary JSON path).
     """
     RESULTS_DIR.mkdir(parents=True, exist_ok=True)
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    output_path = RESULTS_DIR / f"run_{timestamp}.json"
+    results_path = RESULTS_DIR / f"run_{timestamp}.jsonl"
+    summary_path = RESULTS_DIR / f"run_{timestamp}_summary.json"
+
+    with open(results_path, "wb") as f:
+        f.writelines(
+            orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE) for result in results
+        )
 
-    # Compute summary stats for the output
-    total = len(results)
+    # Compute summary stats for the output in one pass over the results
+    avg_r5, avg_r10, avg_mrr = (
+        np.array([[r["recall_at_5"], r["recall_at_10"], r["mrr"]] for r in results])
+        .mean(axis=0)
+        .tolist()
+    )
     summary = {
         "timestamp": timestamp,
-        "total_queries": total,
-        "avg_recall_at_5": sum(r["recall_at_5"] for r in results) / total,
-        "avg_recall_at_10": sum(r["recall_at_10"] for r in results) / total,
-        "avg_mrr": sum(r["mrr"] for r in results) / total,
-    }
-
-    output = {
-        "summary": summary,
-        "results": results,
+        "total_queries": len(results),
+        "results_file": results_path.name,
+        "avg_recall_at_5": avg_r5,
+        "avg_recall_at_10": avg_r10,
+        "avg_mrr": avg_mrr,
     }
+    summary_path.write_bytes(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
 
-    with open(output_path, "w") as f:
-        json.dump(output, f, indent=2)
-
-    return output_path
+    return results_path, summary_path
 
 
 def main() -> None:
     """Run the full evaluation pipeline."""
-    console.print("[bold]Loading eval set...[/bold]")
-    eval_set = load_eval_set()
-    console.print(f"Loaded [cyan]{len(eval_set)}[/cyan] eval queries")
-
+    # The index load (Chroma + BM25) only touches local disk, so it
+    # overlaps with reading the eval set and the network-bound filter prefetch.
     console.print("[bold]Loading index...[/bold]")
-    collection, bm25_index = load_existing()
+    with ThreadPoolExecutor(max_workers=1) as loader:
+        index_future = loader.submit(load_existing)
+
+        console.print("[bold]Loading eval set...[/bold]")
+        eval_set = load_eval_set()
+        console.print(f"Loaded [cyan]{len(eval_set)}[/cyan] eval queries")
+
+        console.print("[bold]Extracting filters...[/bold]")
+        queries = [q["query"] for q in eval_set]
+        try:
+            prefetched: list[dict | None] = [
+                *extract_filters_bulk(queries, max_concurrency=_MAX_WORKERS)
+            ]
+        except (OpenAIError, httpx.HTTPError):
+            # Fall back to per-query extraction, which logs each failure
+            logger.warning("Bulk filter extraction failed; extracting per query")
+            prefetched = [None] * len(eval_set)
+
+        collection, bm25_index = index_future.result()
 
     console.print("[bold]Running evaluations...[/bold]")
-    results: list[dict[str, Any]] = []
-    for i, query_entry in enumerate(eval_set, start=1):
-        console.print(
-            f"  [{i}/{len(eval_set)}] {query_entry['query_id']}: "
-            f"{query_entry['query'][:60]}..."
-        )
-        result = run_eval_query(query_entry, collection, bm25_index)
-        results.append(result)
+    # Filters the bulk prefetch could not supply are extracted per query on a
+    # thread pool (LLM calls are I/O-bound); the searches themselves then go
+    # out as one batched hybrid search.
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+        resolved = list(executor.map(_resolve_filters, queries, prefetched))
+    search_results = search_hybrid_batch(
+        collection,
+        bm25_index,
+        queries,
+        [where or None for _filters, where in resolved],
+        top_k=10,
+    )
+
+    # The batch finishes every query together, so report completion once
+    # rather than per-query lines that would only appear at the end
+    console.print(f"  Retrieved results for [cyan]{len(search_results)}[/cyan] queries")
+    results: list[dict[str, Any]] = [
+        _build_result(query_entry, filters, where, hits)
+        for query_entry, (filters, where), hits in zip(eval_set, resolved, search_results)
+    ]
+
+    score_results(results)
 
     # Print summary
     print_summary(results)
 
     # Save detailed results
-    output_path = save_results(results)
-    console.print(f"Detailed results saved to [cyan]{output_path}[/cyan]")
+    results_path, summary_path = save_results(results)
+    console.print(f"Detailed results saved to [cyan]{results_path}[/cyan]")
+    console.print(f"Summary saved to [cyan]{summary_path}[/cyan]")
 
 
 if __name__ == "__main__":
@@ -4,8 +4,14 @@ import os
 
 from dotenv import load_dotenv
 
+import data
+
 load_dotenv()
 
+# Knowledge base file, under RAG_DATA_DIR when set (resolved in data/ so the
+# generator and the readers agree on it)
+KB_PATH = data.KB_PATH
+
 # Embedding
 EMBEDDING_API_BASE = os.environ["EMBEDDING_API_BASE"]
 EMBEDDING_API_KEY = os.environ["EMBEDDING_API_KEY"]
@@ -32,6 +38,12 @@ LANGFUSE_HOST = os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com")
 CHROMA_PERSIST_DIR = "./chroma_db"
 COLLECTION_NAME = "kb_articles"
 
+# Persistent reranker score cache, kept next to the index it scores (and
+# cleared by the indexer). RERANK_CACHE_PATH="" turns it off.
+RERANK_CACHE_PATH = os.environ.get(
+    "RERANK_CACHE_PATH", os.path.join(CHROMA_PERSIST_DIR, "rerank_cache.sqlite")
+) or None
+
 # Retrieval defaults
 DEFAULT_TOP_K = 5
 RRF_K = 60  # RRF constant
@@ -4,16 +4,28 @@ Uses the intfloat/multilingual-e5-large-instruct model (1024-dim) with
 instruction prefixes applied internally so callers never need to add them.
 """
 
+import functools
+import itertools
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from openai import OpenAI
 
 from src.config import EMBEDDING_API_BASE, EMBEDDING_API_KEY, EMBEDDING_MODEL
-
-_client = OpenAI(base_url=EMBEDDING_API_BASE, api_key=EMBEDDING_API_KEY)
+from src.http_clients import shared_http
 
 _MAX_RETRIES = 3
 _BACKOFF_BASE = 1  # seconds
+_BACKOFF_JITTER = 0.5  # up to +50% random extra delay per retry
+_MAX_CONCURRENCY = 8  # in-flight embedding requests per embed_documents call
+_QUERY_CACHE_SIZE = 512  # distinct query embeddings kept in memory
+
+# Pooled HTTP client: concurrent batches reuse keep-alive connections
+# instead of opening a new TCP/TLS session each
+_client = OpenAI(
+    base_url=EMBEDDING_API_BASE, api_key=EMBEDDING_API_KEY, http_client=shared_http
+)
 
 
 def _embed_with_retry(texts: list[str]) -> list[list[float]]:
@@ -35,36 +47,100 @@ def _embed_with_retry(texts: list[str]) -> list[list[float]]:
         except Exception:
             if attempt == _MAX_RETRIES - 1:
                 raise
-            time.sleep(_BACKOFF_BASE * (2 ** attempt))
+            # Jittered so concurrent batches that failed together do not all
+            # retry at the same instant
+            delay = _BACKOFF_BASE * (2 ** attempt)
+            time.sleep(delay * (1 + random.random() * _BACKOFF_JITTER))
     return []  # unreachable, but keeps type checkers happy
 
 
-def embed_documents(texts: list[str], batch_size: int = 32) -> list[list[float]]:
+def embed_documents(
+    texts: list[str],
+    batch_size: int = 32,
+    max_concurrency: int = _MAX_CONCURRENCY,
+) -> list[list[float]]:
     """Embed document texts with the ``passage: `` instruction prefix.
 
-    Batches requests internally to respect API size limits.
+    Batches requests internally to respect API size limits, and sends up to
+    ``max_concurrency`` batches at once since each call is network-bound.
 
     Args:
         texts: Raw document strings (no prefix needed).
         batch_size: Number of texts per API call.
+        max_concurrency: Maximum number of batches in flight at once.
 
     Returns:
         List of 1024-dimensional embedding vectors, one per input text.
     """
-    all_embeddings: list[list[float]] = []
-    for i in range(0, len(texts), batch_size):
-        batch = [f"passage: {t}" for t in texts[i : i + batch_size]]
-        all_embeddings.extend(_embed_with_retry(batch))
-    return all_embeddings
+    return _embed_batched(
+        [f"passage: {t}" for t in texts], batch_size, max_concurrency
+    )
+
+
+def embed_queries(
+    texts: list[str],
+    batch_size: int = 32,
+    max_concurrency: int = _MAX_CONCURRENCY,
+) -> list[list[float]]:
+    """Embed many queries with the ``query: `` instruction prefix.
+
+    Batched like ``embed_documents``; use this instead of calling
+    ``embed_query`` in a loop when all queries are known up front.
+
+    Args:
+        texts: Raw query strings (no prefix needed).
+        batch_size: Number of texts per API call.
+        max_concurrency: Maximum number of batches in flight at once.
+
+    Returns:
+        List of 1024-dimensional embedding vectors, one per input query.
+    """
+    return _embed_batched(
+        [f"query: {t}" for t in texts], batch_size, max_concurrency
+    )
+
+
+def _embed_batched(
+    prefixed: list[str], batch_size: int, max_concurrency: int
+) -> list[list[float]]:
+    """Embed pre-prefixed texts in batches, sending batches concurrently.
+
+    Args:
+        prefixed: Texts with their instruction prefix already applied.
+        batch_size: Number of texts per API call.
+        max_concurrency: Maximum number of batches in flight at once.
+
+    Returns:
+        List of embedding vectors, in input order.
+    """
+    batches = [
+        prefixed[i : i + batch_size] for i in range(0, len(prefixed), batch_size)
+    ]
+    if len(batches) <= 1 or max_concurrency <= 1:
+        return list(itertools.chain.from_iterable(map(_embed_with_retry, batches)))
+
+    # executor.map yields results in submission order, so vectors stay aligned
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches))) as executor:
+        return list(itertools.chain.from_iterable(executor.map(_embed_with_retry, batches)))
+
+
+@functools.lru_cache(maxsize=_QUERY_CACHE_SIZE)
+def _embed_query_cached(model: str, text: str) -> tuple[float, ...]:
+    # Keyed on the model too so swapping EMBEDDING_MODEL never serves stale
+    # vectors; stored as a tuple so cached entries cannot be mutated
+    return tuple(_embed_with_retry([f"query: {text}"])[0])
 
 
 def embed_query(text: str) -> list[float]:
     """Embed a single query with the ``query: `` instruction prefix.
 
+    Results are memoised per (model, query), so repeating a query skips the
+    round-trip to the embedding service.
+
     Args:
         text: Raw query string (no prefix needed).
 
     Returns:
         A 1024-dimensional embedding vector.
     """
-    return _embed_with_retry([f"query: {text}"])[0]
+    return list(_embed_query_cached(EMBEDDING_MODEL, text))
@@ -4,16 +4,41 @@ Uses the self-hosted LLM to parse user queries and extract structured
 metadata filters compatible with ChromaDB's where clause syntax.
 """
 
+import functools
 import json
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
 
 from openai import OpenAI
 
 from src.config import LLM_API_BASE, LLM_API_KEY, LLM_MODEL
+from src.http_clients import shared_http
 
 logger = logging.getLogger(__name__)
 
-client = OpenAI(base_url=LLM_API_BASE, api_key=LLM_API_KEY)
+client = OpenAI(base_url=LLM_API_BASE, api_key=LLM_API_KEY, http_client=shared_http)
+
+_FILTER_CACHE_SIZE = 4096  # distinct queries kept by extract_filters
+# A filter object with every field set is about 50 tokens; the cap leaves
+# headroom for whitespace without paying for runaway generations
+_FILTER_MAX_TOKENS = 96
+
+# Words that can lead to a filter. Queries with none of them skip the LLM
+# call; it errs broad, since a false hit only costs the usual round-trip.
+_FILTER_HINT = re.compile(
+    r"\bE-\d{4}\b"
+    r"|\b(?:EU|US|USA|APAC|Europe\w*|Asia\w*|Pacific|America\w*)\b"
+    r"|\bv\d|\bversion"
+    r"|auth|login|sign-?on|\bSSO\b|\bMFA\b|password|credential|token"
+    r"|bill|invoice|payment|refund|charge"
+    r"|deploy|release|rollout|container"
+    r"|network|\bDNS\b|\bVPN\b|firewall|\bSSL\b|\bTLS\b|proxy|load balancer"
+    r"|deprecat|legacy|\bold\b|older|previous|outdated|archiv",
+    re.IGNORECASE,
+)
+# What SYSTEM_PROMPT asks for when nothing else applies: current docs only
+_DEFAULT_FILTERS = {"deprecated": False}
 
 SYSTEM_PROMPT = """You are a metadata filter extractor for an IT support knowledge base.
 Given a user query, extract any metadata filters that should be applied
@@ -34,15 +59,30 @@ def extract_filters(query: str) -> dict:
     """Extract structured metadata filters from a natural language query.
 
     Calls the self-hosted LLM to identify region, product version, category,
-    deprecation status, and error codes mentioned in the query.
+    deprecation status, and error codes mentioned in the query. Results are
+    cached per query string (the call is deterministic at temperature 0), so
+    repeated queries skip the LLM round-trip. Queries with no word that could
+    produce a filter skip it too and get the prompt's default (exclude
+    deprecated docs).
 
     Args:
         query: The user's natural language search query.
 
     Returns:
-        A dict of extracted filter fields. Empty dict if no filters detected
-        or if the LLM response cannot be parsed.
+        A dict of extracted filter fields. Queries with no word that could
+        produce a filter get ``{"deprecated": False}``, so the result is
+        truthy even when nothing was extracted from the query. Empty dict if
+        the LLM response cannot be parsed.
     """
+    if not _FILTER_HINT.search(query):
+        return dict(_DEFAULT_FILTERS)
+    # Copy so callers can mutate the result without touching the cache
+    return dict(_extract_filters_cached(query))
+
+
+@functools.lru_cache(maxsize=_FILTER_CACHE_SIZE)
+def _extract_filters_cached(query: str) -> dict:
+    """Uncached body of extract_filters(); exceptions are not cached."""
     response = client.chat.completions.create(
         model=LLM_MODEL,
         messages=[
@@ -50,17 +90,14 @@ def extract_filters(query: str) -> dict:
             {"role": "user", "content": query},
         ],
         temperature=0.0,
-        max_tokens=256,
+        max_tokens=_FILTER_MAX_TOKENS,
+        # JSON mode: the server constrains decoding to a single JSON object,
+        # so there is no prose or markdown fencing to strip
+        response_format={"type": "json_object"},
     )
 
     raw = response.choices[0].message.content.strip()
 
-    # Strip markdown fencing if present
-    if raw.startswith("```"):
-        lines = raw.split("\n")
-        lines = [line for line in lines if not line.startswith("```")]
-        raw = "\n".join(lines).strip()
-
     try:
         filters = json.loads(raw)
     except json.JSONDecodeError:
@@ -74,6 +111,30 @@ def extract_filters(query: str) -> dict:
     return filters
 
 
+def extract_filters_bulk(queries: list[str], max_concurrency: int = 16) -> list[dict]:
+    """Extract filters for many queries with concurrent LLM calls.
+
+    Duplicate queries are sent once. Results also land in the
+    extract_filters() cache, so later single-query calls are free.
+
+    Args:
+        queries: Natural language search queries.
+        max_concurrency: Maximum number of LLM requests in flight at once.
+
+    Returns:
+        One filter dict per query, in input order.
+
+    Raises:
+        Exception: The first LLM call failure, if any.
+    """
+    unique = list(dict.fromkeys(queries))
+    if not unique:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(unique))) as executor:
+        by_query = dict(zip(unique, executor.map(extract_filters, unique)))
+    return [dict(by_query[q]) for q in queries]
+
+
 def convert_to_chromadb_where(filters: dict) -> dict:
     """Convert extracted filters to a ChromaDB-compatible where clause.
 
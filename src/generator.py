@@ -7,8 +7,9 @@ specific document IDs from the knowledge base.
 from openai import OpenAI
 
 from src.config import LLM_API_BASE, LLM_API_KEY, LLM_MODEL
+from src.http_clients import shared_http
 
-client = OpenAI(base_url=LLM_API_BASE, api_key=LLM_API_KEY)
+client = OpenAI(base_url=LLM_API_BASE, api_key=LLM_API_KEY, http_client=shared_http)
 
 SYSTEM_PROMPT = """You are a helpful IT support assistant. Answer the user's question
 based ONLY on the provided context documents. If the context doesn't
@@ -0,0 +1,23 @@
+"""Shared HTTP connection pool for the OpenAI-compatible API clients.
+
+The embedding, filter-extraction, and generation modules each build their
+own ``OpenAI`` client, but all of them send requests through ``shared_http``
+so keep-alive connections (and TLS sessions) are reused across modules
+instead of every client holding a separate pool.
+"""
+
+import importlib.util
+
+import httpx
+from openai import DefaultHttpxClient
+
+# HTTP/2 needs the optional ``h2`` package; without it httpx speaks HTTP/1.1
+# over the same pool
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+# DefaultHttpxClient keeps the SDK's timeout and redirect defaults, which
+# long LLM generations rely on
+shared_http = DefaultHttpxClient(
+    http2=HTTP2_ENABLED,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+)
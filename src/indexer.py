@@ -5,26 +5,38 @@ Run once before any demo::
     uv run python -m src.indexer
 """
 
-import json
+import functools
+import itertools
+import os
+import pickle
 import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
 
 import chromadb
+import orjson
 from chromadb.errors import NotFoundError
 from rich.console import Console
 
-from src.config import CHROMA_PERSIST_DIR, COLLECTION_NAME
+from src.config import CHROMA_PERSIST_DIR, COLLECTION_NAME, KB_PATH, RERANK_CACHE_PATH
 from src.embeddings import embed_documents
 from src.sparse import BM25Index
 
 console = Console()
 
-_DATA_PATH = "data/kb_articles.json"
 _UPSERT_BATCH = 100
+_EMBED_PIPELINE_DEPTH = 2  # upsert batches being embedded ahead of the upserts
+_BM25_CACHE_PATH = Path(CHROMA_PERSIST_DIR) / "bm25.pkl"
+_BM25_CACHE_FORMAT = 7  # bump whenever BM25Index's pickled attributes change
 
 
 def _load_articles() -> list[dict]:
     """Load KB articles from the JSON dataset.
 
+    The parsed list is cached per process and shared between callers (treat
+    it as read-only); it is re-read whenever the file's mtime changes.
+
     Returns:
         List of article dicts.
 
@@ -32,16 +44,74 @@ def _load_articles() -> list[dict]:
         SystemExit: If the data file is missing.
     """
     try:
-        with open(_DATA_PATH) as f:
-            return json.load(f)
+        return _load_articles_cached(os.stat(KB_PATH).st_mtime_ns)
     except FileNotFoundError:
         console.print(
-            f"[red]Error:[/red] {_DATA_PATH} not found. "
+            f"[red]Error:[/red] {KB_PATH} not found. "
             "Run `uv run python -m data.generate_dataset` first."
         )
         sys.exit(1)
 
 
+@functools.lru_cache(maxsize=1)
+def _load_articles_cached(data_mtime: int) -> list[dict]:
+    """Parse the dataset; keyed on its mtime so edits invalidate the cache."""
+    return orjson.loads(KB_PATH.read_bytes())
+
+
+def _save_bm25(bm25_index: BM25Index) -> None:
+    """Pickle the BM25 index next to the ChromaDB files.
+
+    A format number and the dataset's mtime are stored alongside the index
+    so that ``_load_bm25`` can tell when the cache has gone stale.
+
+    Args:
+        bm25_index: Index built from the current ``KB_PATH`` contents.
+    """
+    data_mtime = os.stat(KB_PATH).st_mtime_ns
+    _BM25_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(_BM25_CACHE_PATH, "wb") as f:
+        pickle.dump((_BM25_CACHE_FORMAT, data_mtime, bm25_index), f, protocol=5)
+
+
+def _load_bm25() -> BM25Index | None:
+    """Load the pickled BM25 index if it matches the current dataset.
+
+    Returns:
+        The cached BM25Index, or None if the cache is missing, unreadable,
+        in an older format, or built from a different version of the dataset.
+    """
+    try:
+        data_mtime = os.stat(KB_PATH).st_mtime_ns
+        with open(_BM25_CACHE_PATH, "rb") as f:
+            cache_format, cached_mtime, bm25_index = pickle.load(f)
+    except (
+        OSError,
+        EOFError,
+        pickle.UnpicklingError,
+        AttributeError,
+        ImportError,
+        ValueError,
+        TypeError,
+    ):
+        return None
+    if cache_format != _BM25_CACHE_FORMAT or cached_mtime != data_mtime:
+        return None
+    return bm25_index
+
+
+def _clear_rerank_cache() -> None:
+    """Delete the persistent reranker score cache (and its WAL files).
+
+    Cached scores are keyed by doc_id, so they go stale as soon as article
+    text changes; re-indexing is the point where that can happen.
+    """
+    if not RERANK_CACHE_PATH:
+        return
+    for suffix in ("", "-wal", "-shm"):
+        Path(RERANK_CACHE_PATH + suffix).unlink(missing_ok=True)
+
+
 def index_all() -> tuple[chromadb.Collection, BM25Index]:
     """Create ChromaDB collection and BM25 index from scratch.
 
@@ -53,51 +123,76 @@ def index_all() -> tuple[chromadb.Collection, BM25Index]:
         Tuple of (ChromaDB collection, BM25Index).
     """
     articles = _load_articles()
-    console.print(f"Loaded [cyan]{len(articles)}[/cyan] articles from {_DATA_PATH}")
+    console.print(f"Loaded [cyan]{len(articles)}[/cyan] articles from {KB_PATH}")
 
     # --- ChromaDB setup ---
     client = chromadb.PersistentClient(path=CHROMA_PERSIST_DIR)
-    # Delete existing collection if present so we start fresh
+    # Delete existing collection if present so we start fresh, along with
+    # reranker scores computed against the old article texts
     try:
         client.delete_collection(name=COLLECTION_NAME)
     except (ValueError, NotFoundError):
         pass
+    _clear_rerank_cache()
     collection = client.create_collection(
         name=COLLECTION_NAME,
         metadata={"hnsw:space": "cosine"},
     )
 
-    # --- Dense embeddings ---
-    texts = [a["title"] + " " + a["body"] for a in articles]
+    # --- Column payloads, built once and sliced per upsert batch ---
+    ids = [a["doc_id"] for a in articles]
+    documents = [f"{a['title']}\n\n{a['body']}" for a in articles]
+    metadatas = [
+        {
+            "region": a["region"],
+            "product_version": a["product_version"],
+            "effective_date": a["effective_date"],
+            "category": a["category"],
+            "deprecated": a["deprecated"],
+            "error_codes_str": ",".join(a.get("error_codes", [])),
+        }
+        for a in articles
+    ]
+
+    # --- Dense embeddings, pipelined with the ChromaDB upserts ---
+    # Embedded as "title body" (not the stored "title\n\nbody" document
+    # text): changing the embed input would shift the dense rankings the
+    # demos narrate
+    embed_texts = [f"{a['title']} {a['body']}" for a in articles]
+    starts = range(0, len(articles), _UPSERT_BATCH)
     console.print("Embedding documents...")
-    embeddings = embed_documents(texts)
-    console.print(f"Embedded [cyan]{len(embeddings)}[/cyan] documents")
-
-    # --- Upsert into ChromaDB in batches ---
-    for i in range(0, len(articles), _UPSERT_BATCH):
-        batch_articles = articles[i : i + _UPSERT_BATCH]
-        batch_embeddings = embeddings[i : i + _UPSERT_BATCH]
-
-        ids = [a["doc_id"] for a in batch_articles]
-        documents = [a["title"] + "\n\n" + a["body"] for a in batch_articles]
-        metadatas = [
-            {
-                "region": a["region"],
-                "product_version": a["product_version"],
-                "effective_date": a["effective_date"],
-                "category": a["category"],
-                "deprecated": a["deprecated"],
-                "error_codes_str": ",".join(a.get("error_codes", [])),
-            }
-            for a in batch_articles
-        ]
-
-        collection.upsert(
-            ids=ids,
-            embeddings=batch_embeddings,
-            documents=documents,
-            metadatas=metadatas,
-        )
+    embedded = 0
+    # Upsert batches are embedded on a small pool while this thread upserts
+    # finished ones in order, so HNSW insertion overlaps the network calls.
+    # At most _EMBED_PIPELINE_DEPTH batches are outstanding at a time; the
+    # next one is submitted as each finished batch is taken.
+    batch_starts = iter(starts)
+    with ThreadPoolExecutor(max_workers=_EMBED_PIPELINE_DEPTH) as embed_pool:
+
+        def submit(i: int) -> tuple[int, Future[list[list[float]]]]:
+            batch = embed_texts[i : i + _UPSERT_BATCH]
+            return i, embed_pool.submit(embed_documents, batch)
+
+        pending = deque(map(submit, itertools.islice(batch_starts, _EMBED_PIPELINE_DEPTH)))
+        try:
+            while pending:
+                i, future = pending.popleft()
+                batch_embeddings = future.result()
+                pending.extend(map(submit, itertools.islice(batch_starts, 1)))
+                end = i + _UPSERT_BATCH
+                collection.upsert(
+                    ids=ids[i:end],
+                    embeddings=batch_embeddings,
+                    documents=documents[i:end],
+                    metadatas=metadatas[i:end],
+                )
+                embedded += len(batch_embeddings)
+        except BaseException:
+            # Fail fast: don't wait for batches that have not started yet
+            for _, future in pending:
+                future.cancel()
+            raise
+    console.print(f"Embedded [cyan]{embedded}[/cyan] documents")
 
     console.print(
         f"Upserted [cyan]{collection.count()}[/cyan] documents into ChromaDB"
@@ -105,15 +200,18 @@ def index_all() -> tuple[chromadb.Collection, BM25Index]:
 
     # --- BM25 index ---
     bm25_index = BM25Index(articles)
+    _save_bm25(bm25_index)
     console.print("Built BM25 index")
 
     return collection, bm25_index
 
 
 def load_existing() -> tuple[chromadb.Collection, BM25Index]:
-    """Load an existing ChromaDB collection and rebuild BM25 from disk.
+    """Load an existing ChromaDB collection and the BM25 index.
 
-    Use this in demo scripts to avoid re-embedding the entire corpus.
+    Use this in demo scripts to avoid re-embedding the entire corpus. The
+    BM25 index is read from its pickle cache when that is still current,
+    and rebuilt (and re-cached) from the dataset otherwise.
 
     Returns:
         Tuple of (ChromaDB collection, BM25Index).
@@ -131,12 +229,17 @@ def load_existing() -> tuple[chromadb.Collection, BM25Index]:
         )
         sys.exit(1)
 
-    articles = _load_articles()
-    bm25_index = BM25Index(articles)
+    bm25_index = _load_bm25()
+    action = "loaded cached"
+    if bm25_index is None:
+        bm25_index = BM25Index(_load_articles())
+        _save_bm25(bm25_index)
+        action = "built"
 
     console.print(
         f"Loaded collection with [cyan]{collection.count()}[/cyan] documents "
-        f"and built BM25 index over [cyan]{len(articles)}[/cyan] articles"
+        f"and {action} BM25 index over "
+        f"[cyan]{len(bm25_index.documents)}[/cyan] articles"
     )
     return collection, bm25_index
 
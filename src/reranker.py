@@ -4,15 +4,147 @@ Uses a self-hosted BAAI/bge-reranker-v2-m3 model via a Text Embeddings
 Inference (TEI) endpoint to rerank retrieval results.
 """
 
+import hashlib
+import heapq
 import logging
+import sqlite3
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Self
 
 import httpx
+import orjson
 
-from src.config import RERANKER_API_BASE, RERANKER_API_KEY
+from src.config import (
+    RERANK_CACHE_PATH,
+    RERANKER_API_BASE,
+    RERANKER_API_KEY,
+    RERANKER_MODEL,
+)
+from src.http_clients import HTTP2_ENABLED
 
 logger = logging.getLogger(__name__)
 
+_SQL_BATCH = 500  # doc_ids per IN (...) lookup, under SQLite's variable limit
+_RESULT_CACHE_SIZE = 4096  # recent rerank() outputs kept in memory
+_RESULT_CACHE_TTL = 20.0  # seconds
+_MAX_ATTEMPTS = 3  # for 5xx responses and timeouts; connect errors retry in the transport
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries also expire after a TTL.
+
+    Args:
+        max_items: Maximum number of entries; the least recently used entry
+            is evicted beyond this.
+        ttl_sec: Seconds an entry stays valid after it is set.
+    """
+
+    def __init__(self, max_items: int, ttl_sec: float) -> None:
+        self._max_items = max_items
+        self._ttl_sec = ttl_sec
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any | None:
+        """Return the value for *key*, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self._ttl_sec:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        """Store *value* under *key*, evicting the oldest entry if full."""
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            if len(self._data) > self._max_items:
+                self._data.popitem(last=False)
+
+
+class ScorerCache:
+    """Persistent (query, doc_id) -> score store for reranker scores.
+
+    Cross-encoder scores are point-wise, so a score depends only on the
+    query and the document and can be reused across calls and runs. Doc
+    texts are assumed fixed per doc_id; ``src.indexer.index_all`` deletes
+    the file whenever it rebuilds the collection.
+
+    Args:
+        path: SQLite database file; parent directories are created.
+        namespace: Mixed into every query hash, so scores from different
+            reranker models never collide.
+    """
+
+    def __init__(self, path: str, namespace: str = "") -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Shared across threads (demo3 builds the Reranker in a worker), so
+        # access is serialized with a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._namespace = namespace.encode() + b"\0"
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "query_hash BLOB, doc_id TEXT, score REAL, "
+                "PRIMARY KEY (query_hash, doc_id))"
+            )
+
+    def _hash(self, query: str) -> bytes:
+        return hashlib.blake2b(self._namespace + query.encode(), digest_size=16).digest()
+
+    def get(self, query: str, doc_ids: list[str]) -> dict[str, float]:
+        """Look up cached scores for a query and candidate documents.
+
+        Args:
+            query: The search query.
+            doc_ids: Candidate document IDs.
+
+        Returns:
+            Mapping of doc_id to score for the candidates that are cached.
+        """
+        query_hash = self._hash(query)
+        found: dict[str, float] = {}
+        with self._lock:
+            for i in range(0, len(doc_ids), _SQL_BATCH):
+                chunk = doc_ids[i : i + _SQL_BATCH]
+                rows = self._conn.execute(
+                    "SELECT doc_id, score FROM cache WHERE query_hash = ? "
+                    f"AND doc_id IN ({','.join('?' * len(chunk))})",
+                    (query_hash, *chunk),
+                )
+                found.update(rows)
+        return found
+
+    def put(self, query: str, scores: dict[str, float]) -> None:
+        """Store scores for a query.
+
+        Args:
+            query: The search query.
+            scores: Mapping of doc_id to reranker score.
+        """
+        query_hash = self._hash(query)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (query_hash, doc_id, score) VALUES (?, ?, ?)",
+                [(query_hash, doc_id, score) for doc_id, score in scores.items()],
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
 
 class Reranker:
     """Reranks retrieval results using a TEI rerank endpoint.
@@ -21,31 +153,68 @@ class Reranker:
     which scores them with a cross-encoder model.
     """
 
-    def __init__(self, api_base: str = RERANKER_API_BASE, api_key: str = RERANKER_API_KEY) -> None:
+    def __init__(
+        self,
+        api_base: str = RERANKER_API_BASE,
+        api_key: str = RERANKER_API_KEY,
+        cache_path: str | None = RERANK_CACHE_PATH,
+    ) -> None:
         """Initialize the reranker with the TEI endpoint.
 
         Args:
             api_base: Base URL of the TEI service (e.g. "https://host:port").
             api_key: API key for the TEI service.
+            cache_path: SQLite file for the persistent score cache, or None
+                to always call the endpoint.
         """
+        self._cache = (
+            ScorerCache(cache_path, namespace=RERANKER_MODEL) if cache_path else None
+        )
+        self._result_cache = TTLCache(_RESULT_CACHE_SIZE, _RESULT_CACHE_TTL)
         self.rerank_url = f"{api_base.rstrip('/')}/rerank"
         self.headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {api_key}",
         }
+        # One pooled client so calls reuse the TCP/TLS connection to TEI
+        self._client = httpx.Client(
+            headers=self.headers,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            transport=httpx.HTTPTransport(
+                http2=HTTP2_ENABLED,
+                limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+                retries=2,
+            ),
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the HTTP client and the score cache."""
+        self._client.close()
+        if self._cache:
+            self._cache.close()
 
     def rerank(
         self, query: str, results: list[dict], top_k: int = 5
     ) -> list[dict]:
         """Rerank retrieval results using the TEI rerank endpoint.
 
-        Sends the query and document texts to the TEI /rerank endpoint,
-        then returns the top_k results sorted by descending score.
+        A repeat of a recent call (same query, candidates and top_k) is
+        answered from an in-memory TTL cache. Otherwise scores already in the
+        score cache are reused and only the remaining documents are sent to
+        the TEI /rerank endpoint. Returns the top_k results sorted by
+        descending score.
 
         Args:
             query: The user's search query.
             results: List of retrieval result dicts, each containing at least
-                'title' and 'body' keys for building the document text.
+                'doc_id' plus 'title' and 'body' keys for building the
+                document text.
             top_k: Number of top results to return after reranking.
 
         Returns:
@@ -55,27 +224,75 @@ class Reranker:
         if not results:
             return []
 
-        texts = [
-            f"{r.get('title', '')} {r.get('body', '')}" for r in results
-        ]
+        doc_ids = [r["doc_id"] for r in results]
+        result_key = (query, tuple(doc_ids), top_k)
+        recent = self._result_cache.get(result_key)
+        if recent is not None:
+            # Result dicts hold only scalars, so shallow copies keep callers
+            # from mutating the cached list
+            return [dict(r) for r in recent]
 
-        payload = {"query": query, "texts": texts}
+        cached = self._cache.get(query, doc_ids) if self._cache else {}
+        scores: list[float | None] = [cached.get(doc_id) for doc_id in doc_ids]
+        misses = [i for i, score in enumerate(scores) if score is None]
 
-        scores = self._call_tei(payload)
+        if misses:
+            # Document text is joined only for the candidates TEI must score
+            texts = [
+                f"{results[i].get('title', '')} {results[i].get('body', '')}"
+                for i in misses
+            ]
+            payload = {"query": query, "texts": texts}
+            for item in self._call_tei(payload):
+                scores[misses[item["index"]]] = float(item["score"])
+            if self._cache:
+                self._cache.put(
+                    query,
+                    {doc_ids[i]: scores[i] for i in misses if scores[i] is not None},
+                )
 
-        scored_results = []
-        for item in scores:
-            idx = item["index"]
-            updated = dict(results[idx])
-            updated["score"] = float(item["score"])
-            scored_results.append(updated)
+        # Select the top_k (stable on ties, like a sort) before copying, so
+        # only the kept results are turned into new dicts
+        scored = [(i, score) for i, score in enumerate(scores) if score is not None]
+        reranked: list[dict] = []
+        for rank, (i, score) in enumerate(
+            heapq.nlargest(top_k, scored, key=lambda x: x[1]), start=1
+        ):
+            updated = dict(results[i])
+            updated["score"] = score
+            updated["rank"] = rank
+            reranked.append(updated)
 
-        scored_results.sort(key=lambda x: x["score"], reverse=True)
+        self._result_cache.set(result_key, [dict(r) for r in reranked])
+        return reranked
 
-        for i, result in enumerate(scored_results[:top_k]):
-            result["rank"] = i + 1
+    def rerank_many(
+        self,
+        queries: list[str],
+        candidate_lists: list[list[dict]],
+        top_k: int = 5,
+        max_workers: int = 8,
+    ) -> list[list[dict]]:
+        """Rerank candidates for many queries with concurrent TEI calls.
 
-        return scored_results[:top_k]
+        Args:
+            queries: The search queries.
+            candidate_lists: Retrieval results for each query, aligned with
+                *queries*.
+            top_k: Number of top results to return per query.
+            max_workers: Maximum number of rerank requests in flight at once.
+
+        Returns:
+            One reranked result list per query, in input order.
+        """
+        if not queries:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(queries))) as executor:
+            return list(
+                executor.map(
+                    lambda q, c: self.rerank(q, c, top_k=top_k), queries, candidate_lists
+                )
+            )
 
     def _call_tei(self, payload: dict) -> list[dict]:
         """Call the TEI /rerank endpoint with retries.
@@ -87,20 +304,23 @@ class Reranker:
             List of dicts with 'index' and 'score' keys.
 
         Raises:
-            httpx.HTTPStatusError: If all retries fail.
+            httpx.HTTPStatusError: On a 4xx response, or a 5xx response on
+                the last attempt.
+            httpx.TransportError: If the connection cannot be established,
+                or on a timeout on the last attempt.
         """
-        for attempt in range(3):
+        for attempt in range(_MAX_ATTEMPTS):
             try:
-                response = httpx.post(
-                    self.rerank_url,
-                    json=payload,
-                    headers=self.headers,
-                    timeout=30.0,
-                )
+                # self.headers already declares the JSON content type
+                response = self._client.post(self.rerank_url, content=orjson.dumps(payload))
                 response.raise_for_status()
-                return response.json()
-            except (httpx.HTTPStatusError, httpx.ConnectError, httpx.TimeoutException) as e:
-                if attempt < 2:
+                return orjson.loads(response.content)
+            except (httpx.HTTPStatusError, httpx.TimeoutException) as e:
+                retryable = (
+                    isinstance(e, httpx.TimeoutException)
+                    or e.response.status_code >= 500
+                )
+                if retryable and attempt < _MAX_ATTEMPTS - 1:
                     wait = 2**attempt
                     logger.warning("TEI rerank attempt %d failed: %s. Retrying in %ds.", attempt + 1, e, wait)
                     time.sleep(wait)
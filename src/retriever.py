@@ -4,13 +4,21 @@ Provides three search modes plus a reciprocal-rank-fusion helper and
 post-hoc BM25 metadata filtering for ChromaDB-style where clauses.
 """
 
+import functools
+import heapq
+import json
 import logging
+import sys
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 
 import chromadb
+import numpy as np
 
 from src.config import DEFAULT_TOP_K, RRF_K
-from src.embeddings import embed_query
-from src.sparse import BM25Index
+from src.embeddings import embed_queries, embed_query
+from src.sparse import BM25Index, filter_view
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +27,13 @@ logger = logging.getLogger(__name__)
 # Result helpers
 # ---------------------------------------------------------------------------
 
-def _chroma_to_results(query_result: dict) -> list[dict]:
+def _chroma_to_results(query_result: dict, index: int = 0) -> list[dict]:
     """Convert ChromaDB query output into the standard result format.
 
     Args:
         query_result: Dict returned by ``collection.query()``.
+        index: Which query's results to convert when several query
+            embeddings were sent in one call.
 
     Returns:
         List of result dicts with ``doc_id``, ``title``, ``body``,
@@ -31,25 +41,21 @@ def _chroma_to_results(query_result: dict) -> list[dict]:
         ``score``, and ``rank``.
     """
     results: list[dict] = []
-    ids = query_result["ids"][0]
-    documents = query_result["documents"][0]
-    metadatas = query_result["metadatas"][0]
-    distances = query_result["distances"][0]
-
-    for rank, (doc_id, doc_text, meta, dist) in enumerate(
-        zip(ids, documents, metadatas, distances), start=1
+    ids = query_result["ids"][index]
+    documents = query_result["documents"][index]
+    metadatas = query_result["metadatas"][index]
+    # ChromaDB cosine distance: lower is better.  Convert the whole column
+    # to similarity scores (higher == better) in one vector op.
+    scores = (1.0 - np.asarray(query_result["distances"][index], dtype=np.float64)).tolist()
+
+    for rank, (doc_id, doc_text, meta, score) in enumerate(
+        zip(ids, documents, metadatas, scores), start=1
     ):
-        # ChromaDB cosine distance: lower is better.  Convert to a
-        # similarity score so higher == better.
-        score = 1.0 - dist
-
-        parts = doc_text.split("\n\n", 1)
-        title = parts[0]
-        body = parts[1] if len(parts) > 1 else ""
+        title, _sep, body = doc_text.partition("\n\n")
 
         results.append(
             {
-                "doc_id": doc_id,
+                "doc_id": sys.intern(doc_id),
                 "title": title,
                 "body": body,
                 "region": meta.get("region", ""),
@@ -67,49 +73,127 @@ def _chroma_to_results(query_result: dict) -> list[dict]:
 # Post-hoc metadata filtering for BM25 results
 # ---------------------------------------------------------------------------
 
-def _evaluate_condition(meta: dict, condition: dict) -> bool:
-    """Evaluate a single ChromaDB where condition against metadata.
-
-    Supports ``$eq``, ``$ne``, ``$gt``, ``$gte``, ``$lt``, ``$lte``,
-    ``$in``, ``$nin``, as well as nested ``$and`` / ``$or``.
+# Python source for each comparison operator; {v} is the metadata value and
+# {t} the target. Ordered comparisons never match a missing (None) value.
+_OP_SOURCE = {
+    "$eq": "{v} == {t}",
+    "$ne": "{v} != {t}",
+    "$gt": "({v} is not None and {v} > {t})",
+    "$gte": "({v} is not None and {v} >= {t})",
+    "$lt": "({v} is not None and {v} < {t})",
+    "$lte": "({v} is not None and {v} <= {t})",
+    "$in": "{v} in {t}",
+    "$nin": "{v} not in {t}",
+}
+_WHERE_CACHE_SIZE = 256  # distinct where clauses kept compiled
+
+
+# Evaluation order inside a conjunction: the most selective checks run
+# first so rejected rows fail on as few comparisons as possible. Nested
+# ``$or`` groups are the most expensive conjuncts and always go last.
+_OP_SELECTIVITY = {
+    "$eq": 0,
+    "$in": 1,
+    "$ne": 2,
+    "$gt": 3,
+    "$gte": 3,
+    "$lt": 3,
+    "$lte": 3,
+    "$nin": 4,
+}
+_OR_SELECTIVITY = 5
+
+
+def _join(parts: list[str], op: str, empty: str) -> str:
+    return "(" + f" {op} ".join(parts) + ")" if parts else empty
+
+
+def _conjuncts(condition: dict, consts: list[Any]) -> list[tuple[int, str]]:
+    """Flatten a where condition into ``(selectivity, expression)`` conjuncts.
+
+    Nested ``$and`` children are expanded in place; each field operator
+    becomes its own conjunct, and an ``$or`` group becomes a single one
+    whose alternatives keep their original order.
 
     Args:
-        meta: Metadata dict from an article.
         condition: A single ChromaDB where condition.
+        consts: Constant pool, extended in place.
 
     Returns:
-        True if the metadata satisfies the condition.
+        Conjuncts in source order, tagged with their ``_OP_SELECTIVITY`` rank.
     """
+
+    def const(value: Any) -> str:
+        consts.append(value)
+        return f"_c[{len(consts) - 1}]"
+
     if "$and" in condition:
-        return all(_evaluate_condition(meta, c) for c in condition["$and"])
+        return [part for c in condition["$and"] for part in _conjuncts(c, consts)]
     if "$or" in condition:
-        return any(_evaluate_condition(meta, c) for c in condition["$or"])
+        alternatives = [_where_source(c, consts) for c in condition["$or"]]
+        return [(_OR_SELECTIVITY, _join(alternatives, "or", "False"))]
 
+    parts: list[tuple[int, str]] = []
     for field, constraint in condition.items():
-        value = meta.get(field)
+        value = f"meta.get({const(field)})"
         if isinstance(constraint, dict):
-            for op, target in constraint.items():
-                if op == "$eq" and value != target:
-                    return False
-                if op == "$ne" and value == target:
-                    return False
-                if op == "$gt" and not (value is not None and value > target):
-                    return False
-                if op == "$gte" and not (value is not None and value >= target):
-                    return False
-                if op == "$lt" and not (value is not None and value < target):
-                    return False
-                if op == "$lte" and not (value is not None and value <= target):
-                    return False
-                if op == "$in" and value not in target:
-                    return False
-                if op == "$nin" and value in target:
-                    return False
+            parts.extend(
+                (_OP_SELECTIVITY[op], _OP_SOURCE[op].format(v=value, t=const(target)))
+                for op, target in constraint.items()
+                if op in _OP_SOURCE
+            )
         else:
             # Shorthand: {"field": value} => {"field": {"$eq": value}}
-            if value != constraint:
-                return False
-    return True
+            parts.append((_OP_SELECTIVITY["$eq"], f"{value} == {const(constraint)}"))
+    return parts
+
+
+def _where_source(condition: dict, consts: list[Any]) -> str:
+    """Translate a where condition into a Python boolean expression.
+
+    Field names and targets are never inlined: they are appended to
+    *consts* and referenced as ``_c[i]``, so the generated source contains
+    only ``meta.get`` calls, operators and constant indices. Conjuncts are
+    ordered by selectivity (stable within a rank); Python's ``and``/``or``
+    then stop at the first deciding check.
+
+    Args:
+        condition: A single ChromaDB where condition.
+        consts: Constant pool, extended in place.
+
+    Returns:
+        Expression over ``meta`` (the metadata dict) and ``_c``.
+    """
+    parts = sorted(_conjuncts(condition, consts), key=lambda part: part[0])
+    return _join([expr for _, expr in parts], "and", "True")
+
+
+@functools.lru_cache(maxsize=_WHERE_CACHE_SIZE)
+def _compile_where_json(where_json: str) -> Callable[[dict], bool]:
+    consts: list[Any] = []
+    source = _where_source(json.loads(where_json), consts)
+    return eval(
+        f"lambda meta, _c=_c: {source}", {"__builtins__": {}, "_c": tuple(consts)}
+    )
+
+
+def _compile_where(where: dict) -> Callable[[dict], bool]:
+    """Compile a ChromaDB where clause into a metadata predicate.
+
+    Supports ``$eq``, ``$ne``, ``$gt``, ``$gte``, ``$lt``, ``$lte``,
+    ``$in``, ``$nin``, as well as nested ``$and`` / ``$or``. The clause is
+    turned into a single Python lambda (cached per clause), so filtering a
+    candidate list runs one short-circuiting expression per row instead of
+    re-walking the where dict.
+
+    Args:
+        where: ChromaDB where clause; must be JSON-serializable.
+
+    Returns:
+        Function taking an article's metadata dict and returning True if
+        it satisfies *where*.
+    """
+    return _compile_where_json(json.dumps(where))
 
 
 def apply_filters(
@@ -123,7 +207,8 @@ def apply_filters(
         results: BM25 result dicts (must contain ``doc_id``).
         where: ChromaDB where clause dict.
         articles_by_id: Mapping from ``doc_id`` to full article dict
-            containing metadata fields.
+            containing metadata fields; the ``_filter_view`` precomputed by
+            ``BM25Index`` is used when present.
 
     Returns:
         Subset of *results* whose metadata satisfies *where*.
@@ -131,20 +216,16 @@ def apply_filters(
     if not where:
         return results
 
+    matches = _compile_where(where)
     filtered: list[dict] = []
     for r in results:
         article = articles_by_id.get(r["doc_id"])
         if article is None:
             continue
-        meta = {
-            "region": article.get("region", ""),
-            "product_version": article.get("product_version", ""),
-            "category": article.get("category", ""),
-            "deprecated": article.get("deprecated", False),
-            "effective_date": article.get("effective_date", ""),
-            "error_codes_str": ",".join(article.get("error_codes", [])),
-        }
-        if _evaluate_condition(meta, where):
+        meta = article.get("_filter_view")
+        if meta is None:
+            meta = filter_view(article)
+        if matches(meta):
             filtered.append(r)
     return filtered
 
@@ -156,37 +237,39 @@ def apply_filters(
 def reciprocal_rank_fusion(
     result_lists: list[list[dict]],
     k: int = 60,
+    top_k: int | None = None,
 ) -> list[dict]:
     """Fuse multiple ranked result lists using Reciprocal Rank Fusion.
 
     Args:
         result_lists: List of result lists, each sorted by relevance.
         k: RRF smoothing constant (default 60).
+        top_k: If given, return only the best *top_k* fused results.
 
     Returns:
         Fused results sorted by descending RRF score, with updated
         ``score`` and ``rank`` fields.
     """
     scores: dict[str, float] = {}
-    doc_data: dict[str, dict] = {}
+    # First occurrence of each document; referenced, not copied, until emit
+    doc_refs: dict[str, dict] = {}
 
     for results in result_lists:
         for r in results:
             doc_id = r["doc_id"]
             scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + r["rank"])
-            # Keep the richest version of the document data
-            if doc_id not in doc_data:
-                doc_data[doc_id] = {key: r[key] for key in r if key not in ("score", "rank")}
-
-    sorted_ids = sorted(scores, key=lambda d: scores[d], reverse=True)
-
-    fused: list[dict] = []
-    for rank, doc_id in enumerate(sorted_ids, start=1):
-        entry = dict(doc_data[doc_id])
-        entry["score"] = scores[doc_id]
-        entry["rank"] = rank
-        fused.append(entry)
-    return fused
+            doc_refs.setdefault(doc_id, r)
+
+    # nlargest (like the stable sort) keeps first-seen order among ties
+    if top_k is None:
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    else:
+        ranked = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    return [
+        {**doc_refs[doc_id], "score": score, "rank": rank}
+        for rank, (doc_id, score) in enumerate(ranked, start=1)
+    ]
 
 
 # ---------------------------------------------------------------------------
@@ -210,10 +293,28 @@ def search_dense(
     Returns:
         List of result dicts sorted by descending similarity.
     """
-    query_embedding = embed_query(query)
+    return _query_dense(collection, [embed_query(query)], top_k, where)[0]
+
+
+def _query_dense(
+    collection: chromadb.Collection,
+    query_embeddings: list[list[float]],
+    top_k: int,
+    where: dict | None,
+) -> list[list[dict]]:
+    """Run one ChromaDB query for several embeddings sharing a where clause.
+
+    Args:
+        collection: ChromaDB collection.
+        query_embeddings: Query vectors, searched in a single round-trip.
+        top_k: Number of results per query.
+        where: Optional ChromaDB where clause applied to every query.
 
+    Returns:
+        One result list per query embedding, in input order.
+    """
     kwargs: dict = {
-        "query_embeddings": [query_embedding],
+        "query_embeddings": query_embeddings,
         "n_results": top_k,
         "include": ["documents", "metadatas", "distances"],
     }
@@ -232,7 +333,7 @@ def search_dense(
         else:
             raise
 
-    return _chroma_to_results(query_result)
+    return [_chroma_to_results(query_result, i) for i in range(len(query_embeddings))]
 
 
 def search_sparse(
@@ -250,28 +351,7 @@ def search_sparse(
     Returns:
         List of result dicts sorted by descending BM25 score.
     """
-    bm25_results = bm25_index.search(query, top_k=top_k)
-
-    # Enrich with article metadata
-    articles_by_id = {a["doc_id"]: a for a in bm25_index.documents}
-
-    enriched: list[dict] = []
-    for r in bm25_results:
-        article = articles_by_id.get(r["doc_id"], {})
-        enriched.append(
-            {
-                "doc_id": r["doc_id"],
-                "title": article.get("title", ""),
-                "body": article.get("body", ""),
-                "region": article.get("region", ""),
-                "product_version": article.get("product_version", ""),
-                "category": article.get("category", ""),
-                "deprecated": article.get("deprecated", False),
-                "score": r["score"],
-                "rank": r["rank"],
-            }
-        )
-    return enriched
+    return bm25_index.search(query, top_k=top_k, enrich=True)
 
 
 def search_hybrid(
@@ -285,7 +365,9 @@ def search_hybrid(
     """Hybrid search combining dense and sparse retrieval with RRF fusion.
 
     Over-retrieves from both sources, optionally applies metadata filters
-    to BM25 results post-hoc, then fuses via Reciprocal Rank Fusion.
+    to BM25 results post-hoc, then fuses via Reciprocal Rank Fusion. The
+    dense branch (embedding call + ChromaDB query) runs on a worker thread
+    so its network latency overlaps the BM25 scoring.
 
     Args:
         collection: ChromaDB collection.
@@ -300,14 +382,130 @@ def search_hybrid(
     """
     over_k = top_k * 3
 
-    # Dense branch (ChromaDB handles filtering natively)
-    dense_results = search_dense(collection, query, top_k=over_k, where=where)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Dense branch (ChromaDB handles filtering natively)
+        dense_future = executor.submit(
+            search_dense, collection, query, top_k=over_k, where=where
+        )
+        sparse_results = _sparse_branch(bm25_index, query, top_k, where)
+        dense_results = dense_future.result()
+
+    # Fuse
+    fused = reciprocal_rank_fusion(
+        [dense_results, sparse_results], k=rrf_k, top_k=top_k
+    )
+
+    # If filters produced no results at all, fall back to unfiltered
+    if not fused and where:
+        logger.warning(
+            "Hybrid search with filters returned 0 results; "
+            "retrying without filters."
+        )
+        return search_hybrid(
+            collection, bm25_index, query, top_k=top_k, where=None, rrf_k=rrf_k
+        )
+
+    return fused
+
+
+def search_hybrid_batch(
+    collection: chromadb.Collection,
+    bm25_index: BM25Index,
+    queries: list[str],
+    wheres: list[dict | None],
+    top_k: int = DEFAULT_TOP_K,
+    rrf_k: int = RRF_K,
+) -> list[list[dict]]:
+    """Hybrid search for many queries at once.
+
+    Equivalent to calling ``search_hybrid`` per query, but embeds all the
+    queries in batched requests and sends one ChromaDB query per distinct
+    where clause instead of one per query. As in ``search_hybrid``, the
+    dense side runs on a worker thread while the BM25 branches are scored.
+
+    Args:
+        collection: ChromaDB collection.
+        bm25_index: Initialised BM25Index.
+        queries: Natural-language queries.
+        wheres: Where clause (or None) for each query, aligned with *queries*.
+        top_k: Number of final results to return per query.
+        rrf_k: RRF smoothing constant.
+
+    Returns:
+        One fused result list per query, in input order.
+    """
+    over_k = top_k * 3
+
+    def dense_all() -> list[list[dict]]:
+        embeddings = embed_queries(queries)
+
+        # ChromaDB applies a single where clause to every embedding in a
+        # query, so group the queries by (canonicalised) where clause
+        groups: dict[str, list[int]] = {}
+        for i, where in enumerate(wheres):
+            groups.setdefault(json.dumps(where or None, sort_keys=True), []).append(i)
+
+        dense_by_query: list[list[dict]] = [[] for _ in queries]
+        for members in groups.values():
+            where = wheres[members[0]] or None
+            group_results = _query_dense(
+                collection, [embeddings[i] for i in members], over_k, where
+            )
+            for i, dense_results in zip(members, group_results):
+                dense_by_query[i] = dense_results
+        return dense_by_query
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        dense_future = executor.submit(dense_all)
+        sparse_by_query = [
+            _sparse_branch(bm25_index, query, top_k, where)
+            for query, where in zip(queries, wheres)
+        ]
+        dense_by_query = dense_future.result()
+
+    fused_by_query: list[list[dict]] = []
+    for query, where, dense_results, sparse_results in zip(
+        queries, wheres, dense_by_query, sparse_by_query
+    ):
+        fused = reciprocal_rank_fusion(
+            [dense_results, sparse_results], k=rrf_k, top_k=top_k
+        )
+        if not fused and where:
+            logger.warning(
+                "Hybrid search with filters returned 0 results; "
+                "retrying without filters."
+            )
+            fused = search_hybrid(
+                collection, bm25_index, query, top_k=top_k, where=None, rrf_k=rrf_k
+            )
+        fused_by_query.append(fused)
+    return fused_by_query
+
+
+def _sparse_branch(
+    bm25_index: BM25Index,
+    query: str,
+    top_k: int,
+    where: dict | None,
+) -> list[dict]:
+    """Run the sparse (BM25) branch of a hybrid search.
+
+    Args:
+        bm25_index: Initialised BM25Index.
+        query: Natural-language query.
+        top_k: Number of final results the caller will keep; the branch
+            over-retrieves ``top_k * 3``.
+        where: Optional ChromaDB where clause, applied to BM25 post-hoc.
+
+    Returns:
+        Enriched BM25 results, ready for RRF fusion.
+    """
+    over_k = top_k * 3
 
     # Sparse branch (post-hoc filtering required)
     if where:
         sparse_raw = bm25_index.search(query, top_k=top_k * 10)
-        articles_by_id = {a["doc_id"]: a for a in bm25_index.documents}
-        sparse_filtered = apply_filters(sparse_raw, where, articles_by_id)
+        sparse_filtered = apply_filters(sparse_raw, where, bm25_index.articles_by_id)
 
         # Re-rank after filtering
         for new_rank, item in enumerate(sparse_filtered, start=1):
@@ -322,36 +520,5 @@ def search_hybrid(
     else:
         sparse_results_raw = bm25_index.search(query, top_k=over_k)
 
-    # Enrich sparse results with article data
-    articles_by_id = {a["doc_id"]: a for a in bm25_index.documents}
-    sparse_results: list[dict] = []
-    for r in sparse_results_raw:
-        article = articles_by_id.get(r["doc_id"], {})
-        sparse_results.append(
-            {
-                "doc_id": r["doc_id"],
-                "title": article.get("title", ""),
-                "body": article.get("body", ""),
-                "region": article.get("region", ""),
-                "product_version": article.get("product_version", ""),
-                "category": article.get("category", ""),
-                "deprecated": article.get("deprecated", False),
-                "score": r["score"],
-                "rank": r["rank"],
-            }
-        )
-
-    # Fuse
-    fused = reciprocal_rank_fusion([dense_results, sparse_results], k=rrf_k)
-
-    # If filters produced no results at all, fall back to unfiltered
-    if not fused and where:
-        logger.warning(
-            "Hybrid search with filters returned 0 results; "
-            "retrying without filters."
-        )
-        return search_hybrid(
-            collection, bm25_index, query, top_k=top_k, where=None, rrf_k=rrf_k
-        )
-
-    return fused[:top_k]
+    # Enrich only the surviving results with article data
+    return bm25_index.enrich(sparse_results_raw)
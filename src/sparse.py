@@ -2,11 +2,25 @@
 
 Tokenisation preserves hyphenated tokens (e.g. ``E-4012`` -> ``e-4012``) so
 that error-code searches work correctly.
+
+Scoring is BM25 Okapi with the same parameters and IDF floor as
+``rank_bm25.BM25Okapi``, stored as precomputed per-(term, doc) weights in a
+CSC-style posting layout so a query only touches the docs its terms occur in.
 """
 
+import math
 import re
+import sys
+from collections import Counter
+
+import numpy as np
 
-from rank_bm25 import BM25Okapi
+_TOKEN_RE = re.compile(r"[a-z0-9](?:[a-z0-9-]*[a-z0-9])?")
+
+# BM25 Okapi parameters (rank_bm25 defaults)
+_K1 = 1.5
+_B = 0.75
+_EPSILON = 0.25  # IDF floor for very common terms, as a fraction of mean IDF
 
 
 def tokenize(text: str) -> list[str]:
@@ -24,7 +38,29 @@ def tokenize(text: str) -> list[str]:
     Returns:
         List of lowercase tokens.
     """
-    return re.findall(r"[a-z0-9](?:[a-z0-9-]*[a-z0-9])?", text.lower())
+    return _TOKEN_RE.findall(text.lower())
+
+
+def filter_view(article: dict) -> dict:
+    """Build the metadata dict that where clauses are evaluated against.
+
+    Mirrors the metadata stored in ChromaDB, including ``error_codes_str``
+    (the comma-joined ``error_codes`` list).
+
+    Args:
+        article: KB article dict.
+
+    Returns:
+        Dict of filterable metadata fields.
+    """
+    return {
+        "region": article.get("region", ""),
+        "product_version": article.get("product_version", ""),
+        "category": article.get("category", ""),
+        "deprecated": article.get("deprecated", False),
+        "effective_date": article.get("effective_date", ""),
+        "error_codes_str": ",".join(article.get("error_codes", [])),
+    }
 
 
 class BM25Index:
@@ -32,46 +68,180 @@ class BM25Index:
 
     Args:
         documents: List of article dicts, each containing at least
-            ``doc_id``, ``title``, and ``body`` keys.
+            ``doc_id``, ``title``, and ``body`` keys. They are not modified:
+            the index keeps shallow copies, which gain a ``_filter_view``
+            entry (see ``filter_view``).
     """
 
     def __init__(self, documents: list[dict]) -> None:
         self._doc_ids: list[str] = []
+        # Copied so the caller's records (e.g. the indexer's shared, cached
+        # article list) never see the interned ids or filter views
+        documents = [dict(d) for d in documents]
         self._documents: list[dict] = documents
-        corpus: list[list[str]] = []
-
-        for doc in documents:
-            self._doc_ids.append(doc["doc_id"])
+        # Column index per term, in order of first appearance in the corpus
+        self._vocab: dict[str, int] = {}
+        doc_freq: list[int] = []
+        doc_lens: list[int] = []
+        post_terms: list[int] = []
+        post_docs: list[int] = []
+        post_tfs: list[int] = []
+
+        for doc_idx, doc in enumerate(documents):
+            # Interned so the dict lookups on doc_id in filtering and RRF
+            # hit on identity, and every result shares one string object
+            doc_id = doc["doc_id"] = sys.intern(doc["doc_id"])
+            self._doc_ids.append(doc_id)
             text = doc["title"] + " " + doc["body"]
-            corpus.append(tokenize(text))
-
-        self._bm25 = BM25Okapi(corpus)
+            # Built once here so post-hoc filtering never rebuilds it per hit
+            doc["_filter_view"] = filter_view(doc)
+            tokens = tokenize(text)
+            doc_lens.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                col = self._vocab.setdefault(term, len(self._vocab))
+                if col == len(doc_freq):
+                    doc_freq.append(0)
+                doc_freq[col] += 1
+                post_terms.append(col)
+                post_docs.append(doc_idx)
+                post_tfs.append(tf)
+
+        # IDF with the BM25 Okapi floor: terms in more than half of the docs
+        # get epsilon * mean IDF instead of a negative weight
+        n_docs = len(documents)
+        idf = [math.log(n_docs - df + 0.5) - math.log(df + 0.5) for df in doc_freq]
+        # Plain left-to-right sum (not the compensated built-in sum()) so the
+        # floor, and hence every score, matches rank_bm25 bit for bit
+        idf_sum = 0.0
+        for w in idf:
+            idf_sum += w
+        floor = _EPSILON * (idf_sum / len(idf))
+        idf_arr = np.array([w if w >= 0 else floor for w in idf])
+
+        # Query-independent BM25 weight of every (term, doc) posting
+        terms = np.array(post_terms, dtype=np.intp)
+        docs = np.array(post_docs, dtype=np.intp)
+        tfs = np.array(post_tfs)
+        avgdl = sum(doc_lens) / n_docs
+        length_norm = _K1 * (1 - _B + _B * np.array(doc_lens) / avgdl)
+        weights = idf_arr[terms] * (tfs * (_K1 + 1) / (tfs + length_norm[docs]))
+
+        # Group postings by term (stable, so docs stay in corpus order)
+        order = np.argsort(terms, kind="stable")
+        self._post_docs = docs[order]
+        self._post_weights = weights[order]
+        self._post_ptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(terms, minlength=len(self._vocab))))
+        )
+        self._n_docs = n_docs
+        self._articles_by_id: dict[str, dict] = {d["doc_id"]: d for d in documents}
+
+    def __setstate__(self, state: dict) -> None:
+        # Unpickled strings are not interned; re-intern the doc_ids so a
+        # cached index behaves like a freshly built one
+        self.__dict__.update(state)
+        for doc in self._documents:
+            doc["doc_id"] = sys.intern(doc["doc_id"])
+        self._doc_ids = [sys.intern(doc_id) for doc_id in self._doc_ids]
+        self._articles_by_id = {d["doc_id"]: d for d in self._documents}
 
     @property
     def documents(self) -> list[dict]:
         """Return the underlying document list."""
         return self._documents
 
-    def search(self, query: str, top_k: int = 5) -> list[dict]:
+    @property
+    def articles_by_id(self) -> dict[str, dict]:
+        """Return the mapping from ``doc_id`` to article dict."""
+        return self._articles_by_id
+
+    def article(self, doc_id: str) -> dict | None:
+        """Return the indexed article with *doc_id*, or None if unknown."""
+        return self._articles_by_id.get(doc_id)
+
+    def enrich(self, results: list[dict]) -> list[dict]:
+        """Expand ``search`` hits into full result records.
+
+        Args:
+            results: Dicts with ``doc_id``, ``score``, and ``rank`` keys.
+
+        Returns:
+            New dicts that add the article's ``title``, ``body``, ``region``,
+            ``product_version``, ``category``, and ``deprecated`` fields.
+        """
+        enriched: list[dict] = []
+        for r in results:
+            article = self._articles_by_id.get(r["doc_id"], {})
+            enriched.append(
+                {
+                    "doc_id": r["doc_id"],
+                    "title": article.get("title", ""),
+                    "body": article.get("body", ""),
+                    "region": article.get("region", ""),
+                    "product_version": article.get("product_version", ""),
+                    "category": article.get("category", ""),
+                    "deprecated": article.get("deprecated", False),
+                    "score": r["score"],
+                    "rank": r["rank"],
+                }
+            )
+        return enriched
+
+    def get_scores(self, query: str) -> np.ndarray:
+        """Compute the BM25 score of every document for a query.
+
+        Args:
+            query: Natural-language query string.
+
+        Returns:
+            Array of scores aligned with the indexed documents. Repeated
+            query terms count once per occurrence; unknown terms add nothing.
+        """
+        scores = np.zeros(self._n_docs)
+        for term in tokenize(query):
+            col = self._vocab.get(term)
+            if col is None:
+                continue
+            lo, hi = self._post_ptr[col], self._post_ptr[col + 1]
+            # Docs within one term's postings are unique, so plain fancy-index
+            # accumulation is safe
+            scores[self._post_docs[lo:hi]] += self._post_weights[lo:hi]
+        return scores
+
+    def search(self, query: str, top_k: int = 5, enrich: bool = False) -> list[dict]:
         """Search the index and return the top-k results.
 
         Args:
             query: Natural-language query string.
             top_k: Maximum number of results to return.
+            enrich: If True, return full records as built by ``enrich``.
 
         Returns:
-            List of dicts with keys ``doc_id``, ``score``, and ``rank``,
-            sorted by descending BM25 score.
+            List of dicts with keys ``doc_id``, ``score``, and ``rank``
+            (plus article fields when *enrich* is set), sorted by
+            descending BM25 score.
         """
-        tokenized_query = tokenize(query)
-        scores = self._bm25.get_scores(tokenized_query)
-
-        # Pair each doc_id with its score, sort descending
-        scored = sorted(
-            zip(self._doc_ids, scores), key=lambda x: x[1], reverse=True
-        )
+        scores = self.get_scores(query)
+
+        n = len(scores)
+        k = min(top_k, n)
+        if k <= 0:
+            return []
+        if k < n:
+            # O(N) selection of the k-th best score instead of a full sort.
+            # Ties at the cut-off are taken in corpus order, as the stable
+            # full sort did.
+            kth = np.partition(scores, n - k)[n - k]
+            above = np.flatnonzero(scores > kth)
+            ties = np.flatnonzero(scores == kth)[: k - len(above)]
+            top_idx = np.concatenate((above, ties))
+        else:
+            top_idx = np.arange(n)
+        top_idx = top_idx[np.argsort(-scores[top_idx], kind="stable")]
 
         results: list[dict] = []
-        for rank, (doc_id, score) in enumerate(scored[:top_k], start=1):
-            results.append({"doc_id": doc_id, "score": float(score), "rank": rank})
-        return results
+        for rank, (i, score) in enumerate(
+            zip(top_idx.tolist(), scores[top_idx].tolist()), start=1
+        ):
+            results.append({"doc_id": self._doc_ids[i], "score": score, "rank": rank})
+        return self.enrich(results) if enrich else results
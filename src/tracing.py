@@ -12,8 +12,18 @@ from typing import Any, Generator
 from src.config import LANGFUSE_HOST, LANGFUSE_PUBLIC_KEY, LANGFUSE_SECRET_KEY
 
 
+def _noop(*args: Any, **kwargs: Any) -> None:
+    """Accept any call and do nothing."""
+
+
 class _NullContext:
-    """No-op context manager that accepts any method call and returns itself."""
+    """No-op context manager that accepts any method call and returns itself.
+
+    Methods not defined here (``score``, ``event``, ...) resolve to a shared
+    no-op function, so callers never need defensive ``getattr`` checks.
+    """
+
+    __slots__ = ()
 
     def __enter__(self) -> _NullContext:
         return self
@@ -21,6 +31,12 @@ class _NullContext:
     def __exit__(self, *args: Any) -> None:
         pass
 
+    def __getattr__(self, name: str) -> Any:
+        # Leave dunder probes (copy, pickle, ...) to their normal fallbacks
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _noop
+
     def update(self, **kwargs: Any) -> None:
         """No-op update."""
 
@@ -29,18 +45,27 @@ class _NullContext:
 
     def start_as_current_observation(self, **kwargs: Any) -> _NullContext:
         """Return another no-op context."""
-        return _NullContext()
+        return _NULL_CONTEXT
 
     def update_trace(self, **kwargs: Any) -> None:
         """No-op."""
 
 
+# Stateless and reentrant, so one instance serves every no-op span
+_NULL_CONTEXT = _NullContext()
+
+
 class NullLangfuse:
     """No-op Langfuse client used when credentials are not configured."""
 
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _noop
+
     def start_as_current_observation(self, **kwargs: Any) -> _NullContext:
         """Return a no-op context manager."""
-        return _NullContext()
+        return _NULL_CONTEXT
 
     def flush(self) -> None:
         """No-op flush."""
@@ -88,5 +113,9 @@ def traced_step(
             results = search_hybrid(...)
             span.update(output={"doc_ids": [r["doc_id"] for r in results]})
     """
+    if isinstance(parent, (NullLangfuse, _NullContext)):
+        # Tracing disabled: skip the nested no-op context entirely
+        yield _NULL_CONTEXT
+        return
     with parent.start_as_current_observation(as_type="span", name=name, input=input_data) as span:
         yield span
@@ -15,6 +15,11 @@ from rich.text import Text
 
 console = Console()
 
+# Shared, never-mutated cell renderables for the results tables
+_DEPRECATED_YES = Text("Yes", style="bold red")
+_DEPRECATED_NO = Text("No", style="dim")
+_format_score = "{:.4f}".format
+
 
 def wait_for_enter(label: str = "next step") -> None:
     """Pause execution until the presenter presses Enter.
@@ -76,8 +81,8 @@ def print_results_table(
         deprecated = r.get("deprecated", False)
         score = r.get("score", 0.0)
 
-        dep_text = Text("Yes", style="bold red") if deprecated else Text("No", style="dim")
-        score_str = f"{score:.4f}"
+        dep_text = _DEPRECATED_YES if deprecated else _DEPRECATED_NO
+        score_str = _format_score(score)
 
         row_style = "bold green" if doc_id == highlight_doc_id else None
 
@@ -142,12 +147,14 @@ def print_answer(answer: str, doc_ids: list[str]) -> None:
         doc_ids: List of doc IDs that were provided as context. Occurrences
             of these IDs in the answer text are highlighted.
     """
+    # One pass over the answer; longest IDs first so an ID that is a prefix
+    # of another never splits it
+    ids = sorted({d for d in doc_ids if d}, key=len, reverse=True)
     highlighted = answer
-    for doc_id in doc_ids:
-        highlighted = re.sub(
-            re.escape(doc_id),
-            f"[bold green]{doc_id}[/bold green]",
-            highlighted,
+    if ids:
+        pattern = re.compile("|".join(map(re.escape, ids)))
+        highlighted = pattern.sub(
+            lambda m: f"[bold green]{m.group(0)}[/bold green]", answer
         )
 
     console.print(